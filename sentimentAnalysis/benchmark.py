@@ -0,0 +1,56 @@
+"""
+Entry point for the offline benchmark suite.
+
+Usage:
+    python benchmark.py [--sizes 1000 10000 100000] [--scenarios fast]
+                        [--output bench.json] [--baseline previous.json]
+"""
+
+import argparse
+import os
+import sys
+
+# The benchmark model is built locally; never reach out to the Hub.
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+from sentiment_pipeline.benchmark import (  # noqa: E402
+    DEFAULT_SIZES, SCENARIOS, compare_results, load_results, run_benchmarks, save_results,
+)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--scenarios", nargs="+", default=["fast"], choices=sorted(SCENARIOS))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--max-len", type=int, default=64)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed end-to-end throughput drop (fraction)")
+    parser.add_argument("--stage-threshold", type=float, default=0.25,
+                        help="allowed per-stage throughput drop (fraction)")
+    args = parser.parse_args()
+
+    results = run_benchmarks(sizes=args.sizes, scenarios=args.scenarios,
+                             repeats=args.repeats, max_len=args.max_len)
+    save_results(results, args.output)
+    print(f"\nBenchmark results saved to {args.output}")
+    for key, result in results["results"].items():
+        stages = ", ".join(f"{name} {stage['rows_per_sec']}"
+                           for name, stage in result["stages"].items())
+        print(f"{key}: {result['rows_per_sec']} rows/sec end to end ({stages})")
+
+    if args.baseline:
+        comparison = compare_results(load_results(args.baseline), results,
+                                     threshold=args.threshold,
+                                     stage_threshold=args.stage_threshold)
+        if comparison["environment_diff"]:
+            print(f"\nWarning: environments differ in {comparison['environment_diff']}")
+        print(f"\nCompared with {args.baseline}:")
+        for row in comparison["comparisons"]:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['benchmark']} {row['metric']}: {row['baseline_rows_per_sec']} -> "
+                  f"{row['current_rows_per_sec']} rows/sec ({row['change']:+.1%}){flag}")
+        if comparison["regressions"]:
+            sys.exit(1)
@@ -3,20 +3,47 @@ Sentiment Analysis Pipeline package.
 
 Exposes the main pipeline class and individual stage classes for
 direct import and reuse.
+
+Attributes are resolved lazily on first access, so importing the
+package (or a light-weight class such as TextCleaner) does not pull in
+torch or transformers. Import times are recorded in startup_report().
 """
 
-from .data_loader import DataLoader
-from .text_cleaner import TextCleaner
-from .bert_encoder import BertTextEncoder
-from .classifier import SentimentClassifier
-from .result_formatter import ResultFormatter
-from .pipeline import SentimentPipeline
-
-__all__ = [
-    "DataLoader",
-    "TextCleaner",
-    "BertTextEncoder",
-    "SentimentClassifier",
-    "ResultFormatter",
-    "SentimentPipeline",
-]
+import importlib
+
+from .startup import record_startup, startup_report
+
+_LAZY_ATTRIBUTES = {
+    "DataLoader": ".data_loader",
+    "TextCleaner": ".text_cleaner",
+    "RaggedEncoding": ".ragged_encoding",
+    "BertTextEncoder": ".bert_encoder",
+    "SentimentClassifier": ".classifier",
+    "ShardedClassifier": ".sharded_classifier",
+    "CascadeClassifier": ".cascade",
+    "ResultFormatter": ".result_formatter",
+    "PredictionCache": ".prediction_cache",
+    "StageMetrics": ".stage_metrics",
+    "EmbeddingStore": ".embedding_store",
+    "ExactScanIndex": ".embedding_store",
+    "SentimentPipeline": ".pipeline",
+    "SentimentService": ".service",
+    "compare_classifiers": ".comparison",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES) + ["startup_report"]
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with record_startup(f"import sentiment_pipeline{module_name}"):
+        module = importlib.import_module(module_name, __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
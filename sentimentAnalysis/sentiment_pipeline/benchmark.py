@@ -0,0 +1,297 @@
+"""
+Offline benchmark suite for the sentiment pipeline.
+
+Benchmarks run against a tiny, randomly initialised BERT classifier
+and a local WordPiece vocabulary written to a temporary directory, on
+synthetic review corpora, so they need no network access and no model
+download. Predictions are meaningless; only the timings matter.
+"""
+
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+import transformers
+from transformers import BertConfig, BertForSequenceClassification, BertTokenizer
+
+from .pipeline import SentimentPipeline
+
+# Version of the results format written by run_benchmarks().
+RESULTS_FORMAT = 1
+
+# Pipeline settings benchmarked under each scenario name.
+SCENARIOS = {
+    "baseline": {},
+    "batched": {"batch_size": 32},
+    "fast": {"fast_tokenizer": True, "dynamic_padding": True, "batch_size": 32},
+}
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+# Shape of the random BERT model; small enough to run anywhere, but
+# with the same architecture as the real classifier.
+TINY_BERT_CONFIG = {
+    "hidden_size": 64,
+    "num_hidden_layers": 2,
+    "num_attention_heads": 2,
+    "intermediate_size": 256,
+    "max_position_embeddings": 512,
+    "num_labels": 2,
+}
+
+_NEUTRAL_WORDS = (
+    "the a an and of to in it is was this that with for as on but his her they "
+    "film movie story plot cast acting actor actress director scene scenes ending "
+    "character characters script music camera screen time minutes hour year watch "
+    "watched seen saw see made make there about like just really very much more "
+    "one two first second after before while when then also even still again"
+).split()
+_POSITIVE_WORDS = (
+    "great good excellent brilliant wonderful loved beautiful moving superb "
+    "enjoyable fun charming touching masterpiece Great LOVED"
+).split()
+_NEGATIVE_WORDS = (
+    "bad boring terrible awful dull hated waste poor weak predictable slow "
+    "annoying mess worst Terrible BORING"
+).split()
+# Words missing from the vocabulary, which WordPiece splits into pieces.
+_RARE_WORDS = "cinematography overacted rewatchable screenwriting blockbuster".split()
+
+
+def build_tiny_model(directory: str, seed: int = 0) -> str:
+    """
+    Write a local WordPiece vocabulary, tokenizer files and a randomly
+    initialised BERT sequence classifier to directory, and return it.
+    The result loads with from_pretrained(directory), offline.
+    """
+    letters = [chr(c) for c in range(ord("a"), ord("z") + 1)]
+    words = sorted({w.lower() for w in _NEUTRAL_WORDS + _POSITIVE_WORDS + _NEGATIVE_WORDS})
+    vocab = (["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+             + list(".,!?") + list("0123456789") + letters
+             + [f"##{c}" for c in letters] + words)
+
+    os.makedirs(directory, exist_ok=True)
+    vocab_file = os.path.join(directory, "vocab.txt")
+    with open(vocab_file, "w", encoding="utf-8") as fh:
+        fh.write("\n".join(vocab) + "\n")
+    BertTokenizer(vocab_file).save_pretrained(directory)
+
+    torch.manual_seed(seed)
+    config = BertConfig(vocab_size=len(vocab), **TINY_BERT_CONFIG)
+    BertForSequenceClassification(config).save_pretrained(directory)
+    return directory
+
+
+def synthetic_reviews(n_rows: int, seed: int = 0, chunk_size: int = 10_000) -> pd.DataFrame:
+    """
+    Generate n_rows synthetic reviews in a 'review' column.
+
+    Review lengths follow a log-normal distribution similar to IMDB
+    reviews (median around 170 words, long tail, 10-1500 words). Each
+    review leans positive or negative, and the text contains
+    punctuation, capitalised words, out-of-vocabulary words and
+    occasional <br /> tags, so every cleaning and tokenization path is
+    exercised.
+    """
+    rng = np.random.default_rng(seed)
+    neutral = np.array(_NEUTRAL_WORDS + _RARE_WORDS, dtype=object)
+    polar = (np.array(_NEGATIVE_WORDS, dtype=object), np.array(_POSITIVE_WORDS, dtype=object))
+    endings = np.array([".", ".", ".", "!", ",", "?", ". <br /><br />"], dtype=object)
+
+    reviews = []
+    for start in range(0, n_rows, chunk_size):
+        rows = min(chunk_size, n_rows - start)
+        lengths = np.clip(rng.lognormal(np.log(170), 0.7, rows), 10, 1500).astype(int)
+        polarity = np.repeat(rng.integers(0, 2, rows), lengths)
+        total = int(lengths.sum())
+
+        words = neutral[rng.integers(len(neutral), size=total)]
+        is_polar = rng.random(total) < 0.1
+        for label in (0, 1):
+            mask = is_polar & (polarity == label)
+            words[mask] = polar[label][rng.integers(len(polar[label]), size=int(mask.sum()))]
+        ends = rng.random(total) < 0.08
+        words[ends] = words[ends] + endings[rng.integers(len(endings), size=int(ends.sum()))]
+
+        bounds = np.cumsum(lengths)[:-1]
+        reviews.extend(" ".join(review) for review in np.split(words, bounds))
+    return pd.DataFrame({"review": reviews})
+
+
+def _environment() -> dict:
+    """
+    Describe the machine and library versions behind a result file.
+    """
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "torch": torch.__version__,
+        "transformers": transformers.__version__,
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+    }
+
+
+def _run_once(pipeline) -> dict:
+    """
+    Run the pipeline end to end once and return its timings.
+    """
+    pipeline.metrics.reset()
+    start = time.perf_counter()
+    pipeline.run()
+    seconds = time.perf_counter() - start
+    report = pipeline.metrics.report()
+    report["end_to_end_seconds"] = seconds
+    return report
+
+
+def benchmark_scenario(scenario: str, corpus_file: str, rows: int, model_dir: str,
+                       work_dir: str, repeats: int = 3, max_len: int = 64) -> dict:
+    """
+    Benchmark one scenario on one corpus file.
+
+    The tokenizer and model are loaded and warmed up first, then the
+    pipeline is run repeats times. For end-to-end and for every stage
+    the fastest run is kept, which is the least noisy estimate.
+    """
+    pipeline = SentimentPipeline(
+        input_file=corpus_file,
+        predictions_file=os.path.join(work_dir, "predictions.csv"),
+        output_file=os.path.join(work_dir, "result.csv"),
+        max_len=max_len,
+        quiet=True,
+        model_name=model_dir,
+        tokenizer_name=model_dir,
+        **SCENARIOS[scenario],
+    )
+    pipeline.warmup()
+    runs = [_run_once(pipeline) for _ in range(repeats)]
+    pipeline.close()
+
+    best = min(run["end_to_end_seconds"] for run in runs)
+    stages = {}
+    for name in runs[0]["stages"]:
+        fastest = min((run["stages"][name] for run in runs), key=lambda s: s["seconds"])
+        stage = {"seconds": fastest["seconds"], "rows_per_sec": fastest["rows_per_sec"]}
+        if "tokens_per_sec" in fastest:
+            stage["tokens_per_sec"] = fastest["tokens_per_sec"]
+        stages[name] = stage
+
+    return {
+        "scenario": scenario,
+        "rows": rows,
+        "repeats": repeats,
+        "end_to_end_seconds": round(best, 4),
+        "rows_per_sec": round(rows / best, 2),
+        "peak_rss_mb": max(run["peak_rss_mb"] or 0 for run in runs) or None,
+        "stages": stages,
+    }
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, scenarios=("fast",), repeats: int = 3,
+                   max_len: int = 64, seed: int = 0) -> dict:
+    """
+    Build the tiny model, generate one corpus per size and benchmark
+    every scenario on it. Returns the results in the format written
+    by save_results() and read by compare_results().
+    """
+    unknown = [scenario for scenario in scenarios if scenario not in SCENARIOS]
+    if unknown:
+        raise ValueError(f"Unknown scenarios {unknown}, expected some of {sorted(SCENARIOS)}.")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="sentiment-bench-") as work_dir:
+        model_dir = build_tiny_model(os.path.join(work_dir, "model"), seed=seed)
+        for rows in sizes:
+            corpus_file = os.path.join(work_dir, f"reviews_{rows}.csv")
+            synthetic_reviews(rows, seed=seed).to_csv(corpus_file, index=False)
+            for scenario in scenarios:
+                print(f"\nBenchmarking scenario '{scenario}' on {rows} rows...", file=sys.stderr)
+                results[f"{scenario}/{rows}"] = benchmark_scenario(
+                    scenario, corpus_file, rows, model_dir, work_dir,
+                    repeats=repeats, max_len=max_len,
+                )
+
+    return {
+        "format": RESULTS_FORMAT,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": _environment(),
+        "settings": {"max_len": max_len, "seed": seed, "repeats": repeats,
+                     "model": TINY_BERT_CONFIG},
+        "results": results,
+    }
+
+
+def save_results(results: dict, path: str) -> None:
+    """
+    Write benchmark results as indented JSON.
+    """
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(results, fh, indent=2)
+        fh.write("\n")
+
+
+def load_results(path: str) -> dict:
+    """
+    Read benchmark results written by save_results().
+    """
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.10,
+                    stage_threshold: float = 0.25, min_seconds: float = 0.05) -> dict:
+    """
+    Compare the throughput of two result sets benchmark by benchmark.
+
+    A benchmark regresses when its end-to-end rows/sec drops by more
+    than threshold (a fraction), or when one of its stages drops by
+    more than stage_threshold. Stages that took less than min_seconds
+    in the baseline are too noisy to judge and are skipped.
+
+    Returns every comparison made, the regressions among them, and
+    the environment fields that differ between the two runs (results
+    from different machines or library versions are not comparable).
+    """
+    if baseline.get("format") != current.get("format"):
+        raise ValueError("Benchmark results use different formats and cannot be compared.")
+
+    comparisons = []
+    for key, result in current["results"].items():
+        reference = baseline["results"].get(key)
+        if reference is None:
+            continue
+        checks = [("end_to_end", reference["rows_per_sec"], result["rows_per_sec"], threshold)]
+        for name, stage in result["stages"].items():
+            ref_stage = reference["stages"].get(name)
+            if ref_stage and ref_stage["seconds"] >= min_seconds:
+                checks.append((name, ref_stage["rows_per_sec"], stage["rows_per_sec"],
+                               stage_threshold))
+        for metric, before, after, limit in checks:
+            change = (after - before) / before if before else 0.0
+            comparisons.append({
+                "benchmark": key,
+                "metric": metric,
+                "baseline_rows_per_sec": before,
+                "current_rows_per_sec": after,
+                "change": round(change, 4),
+                "regression": change < -limit,
+            })
+
+    environment_diff = sorted(
+        field for field in set(baseline["environment"]) | set(current["environment"])
+        if baseline["environment"].get(field) != current["environment"].get(field)
+    )
+    return {
+        "comparisons": comparisons,
+        "regressions": [c for c in comparisons if c["regression"]],
+        "environment_diff": environment_diff,
+    }
@@ -2,8 +2,11 @@
 Steps 3-5: Tokenization, ID conversion, padding & attention masks.
 """
 
+import numpy as np
 import pandas as pd
-from transformers import BertTokenizer
+
+from .ragged_encoding import RaggedEncoding
+from .startup import record_startup
 
 
 class BertTextEncoder:
@@ -11,11 +14,55 @@ class BertTextEncoder:
     Wraps the BERT tokenizer and handles all text-to-tensor
     preparation steps: tokenizing, ID conversion, padding, and
     attention mask creation.
+
+    With use_fast=True the Rust-backed BertTokenizerFast is loaded
+    instead of the pure-Python BertTokenizer, and encode_dataframe_fast()
+    can replace Steps 3-5 with a single batched call.
+
+    The tokenizer (and transformers itself) is only loaded when it is
+    first needed, or explicitly through warmup().
+
+    verbose=False skips the data previews.
     """
 
-    def __init__(self, model_name: str = "bert-base-uncased", max_len: int = 64):
-        self.tokenizer = BertTokenizer.from_pretrained(model_name)
+    def __init__(self, model_name: str = "bert-base-uncased", max_len: int = 64,
+                 use_fast: bool = False, verbose: bool = True):
+        self.model_name = model_name
+        self.use_fast = use_fast
         self.max_len = max_len
+        self.verbose = verbose
+        self.padding_stats = None
+        self._tokenizer = None
+
+    @property
+    def tokenizer(self):
+        """
+        The BERT tokenizer, loaded on first access.
+        """
+        if self._tokenizer is None:
+            self.load()
+        return self._tokenizer
+
+    def load(self) -> None:
+        """
+        Load the tokenizer, if not done yet.
+        """
+        if self._tokenizer is not None:
+            return
+        with record_startup("import transformers"):
+            from transformers import BertTokenizer, BertTokenizerFast
+        tokenizer_cls = BertTokenizerFast if self.use_fast else BertTokenizer
+        with record_startup(f"load tokenizer ({self.model_name})"):
+            self._tokenizer = tokenizer_cls.from_pretrained(self.model_name)
+
+    def warmup(self) -> None:
+        """
+        Load the tokenizer and run one encoding, so the first real
+        request does not pay for it.
+        """
+        self.load()
+        with record_startup("warmup encoder"):
+            self.encode_batch(["warmup"])
 
     # ---------------- Step 3 ----------------
     def tokenize(self, text: str):
@@ -30,8 +77,9 @@ class BertTextEncoder:
         Apply tokenize() to an entire DataFrame column.
         """
         df[target_col] = df[source_col].apply(self.tokenize)
-        print("\nTokenized data preview:")
-        print(df[[source_col, target_col]].head())
+        if self.verbose:
+            print("\nTokenized data preview:")
+            print(df[[source_col, target_col]].head())
         return df
 
     # ---------------- Step 4 ----------------
@@ -47,8 +95,9 @@ class BertTextEncoder:
         Apply tokens_to_ids() to an entire DataFrame column.
         """
         df[target_col] = df[source_col].apply(self.tokens_to_ids)
-        print("\nToken ID preview:")
-        print(df[[source_col, target_col]].head())
+        if self.verbose:
+            print("\nToken ID preview:")
+            print(df[[source_col, target_col]].head())
         return df
 
     # ---------------- Step 5 ----------------
@@ -80,6 +129,142 @@ class BertTextEncoder:
         df["input_ids"], df["attention_mask"] = zip(
             *df[source_col].apply(self.encode_with_padding)
         )
-        print("\nInput IDs and Attention Mask preview:")
-        print(df[[source_col, "input_ids", "attention_mask"]].head())
+        if self.verbose:
+            print("\nInput IDs and Attention Mask preview:")
+            print(df[[source_col, "input_ids", "attention_mask"]].head())
+        return df
+
+    # ---------------- Steps 3-5 (single pass) ----------------
+    def encode_batch(self, texts):
+        """
+        Encode a sequence of texts with one batched tokenizer call,
+        padding and truncating every row to max_len.
+
+        Returns a dict with 'input_ids' and 'attention_mask' as
+        (n_rows, max_len) int64 NumPy arrays.
+        """
+        encoding = self.tokenizer(
+            list(texts),
+            add_special_tokens=True,
+            max_length=self.max_len,
+            padding="max_length",
+            truncation=True,
+            return_attention_mask=True,
+            return_tensors="np"
+        )
+        return {
+            "input_ids": encoding["input_ids"].astype(np.int64, copy=False),
+            "attention_mask": encoding["attention_mask"].astype(np.int64, copy=False),
+        }
+
+    def encode_dataframe_fast(self, df: pd.DataFrame, source_col: str = "clean_review",
+                              debug_tokens: bool = False) -> pd.DataFrame:
+        """
+        Replace Steps 3-5 with a single batched encoding pass over the
+        whole column, producing the 'input_ids' and 'attention_mask'
+        columns as rows of one contiguous NumPy array each.
+
+        The WordPiece 'tokens' and 'token_ids' debug columns are only
+        produced when debug_tokens=True.
+        """
+        texts = df[source_col].tolist()
+        encoding = self.encode_batch(texts)
+        df["input_ids"] = list(encoding["input_ids"])
+        df["attention_mask"] = list(encoding["attention_mask"])
+
+        if debug_tokens:
+            self._add_debug_token_columns(df, texts)
+
+        if self.verbose:
+            print("\nInput IDs and Attention Mask preview:")
+            print(df[[source_col, "input_ids", "attention_mask"]].head())
+        return df
+
+    def _add_debug_token_columns(self, df: pd.DataFrame, texts) -> None:
+        """
+        Add the WordPiece 'tokens' and 'token_ids' debug columns
+        using one batched tokenizer call.
+        """
+        token_ids = self.tokenizer(texts, add_special_tokens=False)["input_ids"]
+        df["tokens"] = [self.tokenizer.convert_ids_to_tokens(ids) for ids in token_ids]
+        df["token_ids"] = token_ids
+
+    # ---------------- Steps 3-5 (dynamic padding) ----------------
+    def encode_ragged(self, texts) -> RaggedEncoding:
+        """
+        Encode a sequence of texts with one batched tokenizer call,
+        truncating to max_len but without any padding.
+        """
+        encoding = self.tokenizer(
+            list(texts),
+            add_special_tokens=True,
+            max_length=self.max_len,
+            padding=False,
+            truncation=True,
+            return_attention_mask=False,
+        )
+        return RaggedEncoding.from_lists(encoding["input_ids"])
+
+    def padding_waste(self, lengths, batch_size: int = 1) -> dict:
+        """
+        Report how much of the attention work would be spent on
+        padding, both with fixed max_len padding and with dynamic
+        per-batch padding over length-bucketed batches of batch_size.
+
+        Also reports length percentiles and the number of rows that
+        reach max_len (and may have been truncated), to help tune
+        max_len.
+        """
+        lengths = np.asarray(lengths, dtype=np.int64)
+        if len(lengths) == 0:
+            return {"rows": 0}
+
+        real_tokens = int(lengths.sum())
+        fixed_slots = len(lengths) * self.max_len
+
+        ordered = np.sort(lengths, kind="stable")
+        dynamic_slots = sum(
+            len(batch) * int(batch.max())
+            for batch in (ordered[i:i + batch_size] for i in range(0, len(ordered), batch_size))
+        )
+
+        return {
+            "rows": len(lengths),
+            "max_len": self.max_len,
+            "batch_size": batch_size,
+            "real_tokens": real_tokens,
+            "fixed_padding_waste": round(1 - real_tokens / fixed_slots, 4),
+            "dynamic_padding_waste": round(1 - real_tokens / dynamic_slots, 4),
+            "length_p50": int(np.percentile(lengths, 50)),
+            "length_p90": int(np.percentile(lengths, 90)),
+            "length_p99": int(np.percentile(lengths, 99)),
+            "rows_at_max_len": int((lengths >= self.max_len).sum()),
+        }
+
+    def encode_dataframe_dynamic(self, df: pd.DataFrame, source_col: str = "clean_review",
+                                 batch_size: int = 1,
+                                 debug_tokens: bool = False) -> pd.DataFrame:
+        """
+        Replace Steps 3-5 with a single batched encoding pass that
+        leaves rows unpadded, so each inference batch can be padded
+        only to its longest member.
+
+        'input_ids' rows are views into one flat RaggedEncoding array
+        and 'attention_mask' rows are views into one shared ones
+        buffer. The padding-waste report for the given batch_size is
+        kept in self.padding_stats, and printed when verbose.
+        """
+        texts = df[source_col].tolist()
+        encoding = self.encode_ragged(texts)
+        df["input_ids"] = encoding.rows()
+        df["attention_mask"] = encoding.attention_rows()
+
+        if debug_tokens:
+            self._add_debug_token_columns(df, texts)
+
+        self.padding_stats = self.padding_waste(encoding.lengths, batch_size)
+        if self.verbose:
+            print("\nInput IDs and Attention Mask preview:")
+            print(df[[source_col, "input_ids", "attention_mask"]].head())
+            print(f"\nPadding waste: {self.padding_stats}")
         return df
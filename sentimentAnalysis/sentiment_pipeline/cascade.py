@@ -0,0 +1,125 @@
+"""
+Step 6 (cascade): cheap TF-IDF + linear first tier in front of BERT.
+"""
+
+import numpy as np
+
+
+def _sklearn():
+    """
+    Import the scikit-learn pieces used by the cascade, with a clear
+    error when it is not installed. Deferred, like joblib in save() and
+    load(), so pipelines without a cascade never import scikit-learn.
+    """
+    try:
+        from sklearn.calibration import CalibratedClassifierCV
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import make_pipeline
+    except ImportError as exc:
+        raise ImportError("Cascade mode requires scikit-learn: pip install scikit-learn") from exc
+    return CalibratedClassifierCV, TfidfVectorizer, LogisticRegression, make_pipeline
+
+
+class CascadeClassifier:
+    """
+    A fast TF-IDF + logistic regression model trained to reproduce the
+    BERT classifier's labels on cleaned review text.
+
+    Its probabilities are calibrated out of fold, so they estimate how
+    likely BERT is to call a review positive. In cascade mode rows
+    whose calibrated confidence reaches threshold are answered by this
+    model and only the rest go through BERT.
+    """
+
+    LABELS = np.array(["negative", "positive"], dtype=object)
+
+    def __init__(self, threshold: float = 0.9, max_features: int = 200_000,
+                 ngram_range=(1, 2), C: float = 4.0, calibration_folds: int = 3):
+        self.threshold = threshold
+        self.max_features = max_features
+        self.ngram_range = tuple(ngram_range)
+        self.C = C
+        self.calibration_folds = calibration_folds
+        self.model = None
+
+    def fit(self, texts, bert_labels) -> "CascadeClassifier":
+        """
+        Train on cleaned texts and the labels BERT gave them.
+
+        Raises:
+            ValueError: if the labels do not contain both sentiments.
+        """
+        calibrated_cls, tfidf_cls, logistic_cls, make_pipeline = _sklearn()
+        targets = (np.asarray(bert_labels, dtype=object) == "positive").astype(np.int8)
+        if targets.min() == targets.max():
+            raise ValueError("Cascade training data needs both positive and negative BERT labels.")
+
+        self.model = make_pipeline(
+            tfidf_cls(ngram_range=self.ngram_range, max_features=self.max_features,
+                      sublinear_tf=True, min_df=2, dtype=np.float32),
+            calibrated_cls(logistic_cls(C=self.C, max_iter=1000),
+                           method="sigmoid", cv=self.calibration_folds),
+        )
+        self.model.fit(list(texts), targets)
+        return self
+
+    def predict_proba(self, texts) -> np.ndarray:
+        """
+        Return calibrated [negative, positive] probabilities as a
+        float32 (n, 2) array.
+        """
+        if self.model is None:
+            raise RuntimeError("CascadeClassifier must be fitted (or loaded) before use.")
+        return self.model.predict_proba(list(texts)).astype(np.float32)
+
+    @classmethod
+    def labels(cls, probabilities: np.ndarray) -> np.ndarray:
+        """
+        Map (n, 2) probabilities to sentiment labels, breaking ties
+        towards 'negative' like the BERT classifier's argmax.
+        """
+        return cls.LABELS[np.argmax(probabilities, axis=1)]
+
+    def threshold_report(self, texts, bert_labels,
+                         thresholds=(0.8, 0.85, 0.9, 0.95, 0.98, 0.99)) -> list:
+        """
+        For each candidate threshold, report on held-out texts which
+        share of rows the cascade would answer, how often it agrees
+        with BERT on those rows, and the resulting overall agreement
+        with BERT-only results.
+        """
+        bert_labels = np.asarray(bert_labels, dtype=object)
+        probabilities = self.predict_proba(texts)
+        agree = self.labels(probabilities) == bert_labels
+        confidence = probabilities.max(axis=1)
+
+        report = []
+        for threshold in thresholds:
+            confident = confidence >= threshold
+            report.append({
+                "threshold": threshold,
+                "cascade_share": round(float(confident.mean()), 4),
+                "bert_share": round(float(1 - confident.mean()), 4),
+                "cascade_agreement": (round(float(agree[confident].mean()), 4)
+                                      if confident.any() else None),
+                "overall_agreement": round(float((agree | ~confident).mean()), 4),
+            })
+        return report
+
+    def save(self, path: str) -> None:
+        """
+        Persist the fitted cascade with joblib.
+        """
+        import joblib
+
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path: str) -> "CascadeClassifier":
+        """
+        Load a cascade written by save().
+        """
+        import joblib
+
+        return joblib.load(path)
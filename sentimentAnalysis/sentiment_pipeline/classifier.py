@@ -2,51 +2,272 @@
 Step 6: Real BERT Sentiment Classification (IMDB model).
 """
 
-import torch
+from collections import Counter
+
+import numpy as np
 import pandas as pd
-from transformers import BertForSequenceClassification
+
+from .startup import record_startup
 
 
 class SentimentClassifier:
     """
     Loads a pretrained BERT sentiment classifier and runs inference
     on encoded review text.
+
+    By default every review is classified with its own forward pass.
+    When a batch_size is given, reviews are grouped into buckets of
+    similar token length and each bucket is classified with a single
+    forward pass.
+
+    With quantize=True the model's Linear layers are dynamically
+    quantized to INT8 for faster, smaller CPU inference. The quantized
+    weights are cached in cache_dir so later runs skip quantization.
+
+    backend selects the inference engine: "torch" (eager PyTorch, the
+    default) or "onnx" (ONNX Runtime on a cached ONNX export, with
+    configurable intra_op_threads / inter_op_threads). Both produce the
+    same outputs, so downstream stages are unaffected.
+
+    The model (and torch itself) is only loaded when the first batch
+    needs it, or explicitly through load() / warmup().
+
+    Probabilities are kept as a contiguous float32 (n, 2) array and
+    stored in the 'prob_negative' / 'prob_positive' columns; labels
+    are derived from the predicted class indices in one NumPy call.
+
+    Every forward pass is counted in self.batch_sizes (a histogram of
+    batch sizes) and self.tokens_classified (real, unpadded tokens).
+    verbose=False skips the data preview.
+
+    With an embedding_store (an EmbeddingStore, torch backend only)
+    classify_dataframe() also stores every review's embedding from the
+    same forward pass, keyed by the 'embedding_id' column (the DataFrame
+    index without one) as review ID. IDs already in the store are not
+    added again.
+    embedding_pooling selects "mean" (mask-weighted mean of the last
+    hidden states) or "pooler" (BERT's pooled [CLS] output).
     """
 
-    def __init__(self, model_name: str = "textattack/bert-base-uncased-imdb"):
+    DEFAULT_MODEL = "textattack/bert-base-uncased-imdb"
+
+    def __init__(self, model_name: str = DEFAULT_MODEL,
+                 batch_size: int = None,
+                 quantize: bool = False,
+                 cache_dir: str = "model_cache",
+                 backend: str = "torch",
+                 intra_op_threads: int = None,
+                 inter_op_threads: int = None,
+                 verbose: bool = True,
+                 embedding_store=None,
+                 embedding_pooling: str = "mean"):
+        if backend not in ("torch", "onnx"):
+            raise ValueError(f"Unknown backend '{backend}', expected 'torch' or 'onnx'.")
+        if backend == "onnx" and quantize:
+            raise ValueError("quantize=True is only supported by the 'torch' backend.")
+        if embedding_pooling not in ("mean", "pooler"):
+            raise ValueError(f"Unknown embedding_pooling '{embedding_pooling}', "
+                             "expected 'mean' or 'pooler'.")
+        if backend == "onnx" and embedding_store is not None:
+            raise ValueError("Embeddings are only supported by the 'torch' backend.")
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.quantize = quantize
+        self.cache_dir = cache_dir
+        self.backend_name = backend
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.verbose = verbose
+        self.embedding_store = embedding_store
+        self.embedding_pooling = embedding_pooling
+        self.batch_sizes = Counter()
+        self.tokens_classified = 0
+        self._backend = None
+
+    @property
+    def backend(self):
+        """
+        The inference backend, loaded on first access.
+        """
+        if self._backend is None:
+            self.load()
+        return self._backend
+
+    def load(self) -> None:
+        """
+        Load the model into the configured backend, if not done yet.
+        """
+        if self._backend is not None:
+            return
         print("\nLoading BERT IMDB sentiment model...")
-        self.model = BertForSequenceClassification.from_pretrained(model_name)
-        self.model.eval()
+        with record_startup("import torch/transformers"):
+            from .inference_backends import OnnxBackend, TorchBackend
+        with record_startup(f"load model ({self.model_name}, {self.backend_name})"):
+            if self.backend_name == "torch":
+                self._backend = TorchBackend(self.model_name, quantize=self.quantize,
+                                             cache_dir=self.cache_dir)
+            else:
+                self._backend = OnnxBackend(self.model_name, cache_dir=self.cache_dir,
+                                            intra_op_threads=self.intra_op_threads,
+                                            inter_op_threads=self.inter_op_threads)
+
+    def prepare(self) -> None:
+        """
+        Create the backend's cached model files (the ONNX export or the
+        INT8 weights) if they are missing, without loading the model.
+        """
+        with record_startup("import torch/transformers"):
+            from .inference_backends import OnnxBackend, TorchBackend
+        if self.backend_name == "torch":
+            TorchBackend.prepare(self.model_name, quantize=self.quantize,
+                                 cache_dir=self.cache_dir)
+        else:
+            OnnxBackend.prepare(self.model_name, cache_dir=self.cache_dir)
+
+    def warmup(self) -> None:
+        """
+        Load the model and run one tiny forward pass, so the first real
+        batch does not pay for one-off initialisation.
+        """
+        self.load()
+        with record_startup("warmup classifier"):
+            self.classify_batch([[self.backend.pad_token_id] * 2], [[1, 1]])
+
+    @staticmethod
+    def _label(sentiment_idx: int) -> str:
+        """
+        Map a predicted class index to its sentiment label.
+        """
+        return "positive" if sentiment_idx == 1 else "negative"
+
+    @staticmethod
+    def _labels(sentiment_idx) -> list:
+        """
+        Map an array of predicted class indices to sentiment labels.
+        """
+        return np.where(np.asarray(sentiment_idx) == 1, "positive", "negative").tolist()
 
     def classify(self, input_ids, attention_mask):
         """
         Perform inference using the pretrained IMDB BERT classifier.
-        Returns the raw sentiment label and probability vector.
+        Returns the raw sentiment label and float32 probability vector.
+        """
+        self.batch_sizes[1] += 1
+        self.tokens_classified += int(np.sum(attention_mask))
+        probabilities, sentiment_idx = self.backend.predict(
+            np.asarray(input_ids)[np.newaxis, :],
+            np.asarray(attention_mask)[np.newaxis, :],
+        )
+        probabilities = probabilities[0]
+        sentiment_label = self._label(sentiment_idx[0])
+
+        return sentiment_label, probabilities
+
+    def classify_batch(self, input_ids, attention_mask, return_embeddings: bool = False):
         """
-        ids_tensor = torch.tensor(input_ids).unsqueeze(0)
-        mask_tensor = torch.tensor(attention_mask).unsqueeze(0)
+        Classify a batch of encoded reviews with a single forward pass.
 
-        with torch.no_grad():
-            outputs = self.model(input_ids=ids_tensor, attention_mask=mask_tensor)
-            logits = outputs.logits
-            probabilities = torch.softmax(logits, dim=1).tolist()[0]
+        Rows are trimmed (or padded) to the longest real sequence in
+        the batch, so trailing padding shared by every row is never
+        fed through the model. Returns a list of sentiment labels and
+        a float32 (batch, 2) probability array, in the order of the
+        input rows, plus a float32 (batch, hidden) embedding array
+        when return_embeddings is set.
+        """
+        lengths = [int(np.sum(mask)) for mask in attention_mask]
+        seq_len = max(max(lengths), 1)
+        pad_id = self.backend.pad_token_id
+        self.batch_sizes[len(lengths)] += 1
+        self.tokens_classified += sum(lengths)
 
-        sentiment_idx = int(torch.argmax(logits, dim=1).item())
-        sentiment_label = "positive" if sentiment_idx == 1 else "negative"
+        ids_batch = np.full((len(lengths), seq_len), pad_id, dtype=np.int64)
+        mask_batch = np.zeros((len(lengths), seq_len), dtype=np.int64)
+        for row, (ids, length) in enumerate(zip(input_ids, lengths)):
+            ids_batch[row, :length] = np.asarray(ids)[:length]
+            mask_batch[row, :length] = 1
 
-        return sentiment_label, probabilities
+        if return_embeddings:
+            probabilities, sentiment_idx, embeddings = self.backend.predict(
+                ids_batch, mask_batch, pooling=self.embedding_pooling
+            )
+            return self._labels(sentiment_idx), probabilities, embeddings
 
-    def classify_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+        probabilities, sentiment_idx = self.backend.predict(ids_batch, mask_batch)
+        return self._labels(sentiment_idx), probabilities
+
+    def classify_bucketed(self, input_ids, attention_mask, batch_size: int,
+                          return_embeddings: bool = False):
         """
-        Apply classify() row-wise across the DataFrame, producing
-        'sentiment_raw' and 'probabilities' columns.
+        Classify all rows in length-bucketed batches of at most
+        batch_size rows.
+
+        Rows are sorted by their real token count so each batch
+        holds reviews of similar length, then results (and embeddings,
+        with return_embeddings) are scattered back into the original
+        row order.
         """
-        df["sentiment_raw"], df["probabilities"] = zip(
-            *df.apply(
-                lambda row: self.classify(row["input_ids"], row["attention_mask"]),
-                axis=1,
+        input_ids = list(input_ids)
+        attention_mask = list(attention_mask)
+        lengths = np.array([int(np.sum(mask)) for mask in attention_mask])
+        order = np.argsort(lengths, kind="stable")
+
+        labels = np.empty(len(order), dtype=object)
+        probabilities = np.empty((len(order), 2), dtype=np.float32)
+        embeddings = None
+        for start in range(0, len(order), batch_size):
+            bucket = order[start:start + batch_size]
+            outputs = self.classify_batch(
+                [input_ids[i] for i in bucket],
+                [attention_mask[i] for i in bucket],
+                return_embeddings=return_embeddings,
             )
-        )
-        print("\nRaw sentiment prediction preview:")
-        print(df[["clean_review", "sentiment_raw", "probabilities"]].head())
+            labels[bucket] = outputs[0]
+            probabilities[bucket] = outputs[1]
+            if return_embeddings:
+                if embeddings is None:
+                    embeddings = np.empty((len(order), outputs[2].shape[1]), dtype=np.float32)
+                embeddings[bucket] = outputs[2]
+
+        if return_embeddings:
+            return labels.tolist(), probabilities, embeddings
+        return labels.tolist(), probabilities
+
+    def classify_dataframe(self, df: pd.DataFrame, batch_size: int = None) -> pd.DataFrame:
+        """
+        Classify every row of the DataFrame, producing the
+        'sentiment_raw', 'prob_negative' and 'prob_positive' columns.
+
+        Uses classify() row-wise unless a batch_size is given (here or
+        in the constructor), in which case classify_bucketed() is used.
+        With an embedding_store, rows are always classified through
+        classify_bucketed() (one row per batch without a batch_size)
+        and the embeddings of reviews not stored yet are appended.
+        """
+        batch_size = batch_size or self.batch_size
+        if self.embedding_store is not None:
+            labels, probabilities, embeddings = self.classify_bucketed(
+                df["input_ids"], df["attention_mask"], batch_size or 1,
+                return_embeddings=True,
+            )
+            if embeddings is not None:
+                ids = df["embedding_id"] if "embedding_id" in df else df.index
+                self.embedding_store.append_new(ids, embeddings)
+        elif batch_size:
+            labels, probabilities = self.classify_bucketed(
+                df["input_ids"], df["attention_mask"], batch_size
+            )
+        else:
+            labels, probabilities = zip(
+                *df.apply(
+                    lambda row: self.classify(row["input_ids"], row["attention_mask"]),
+                    axis=1,
+                )
+            )
+            probabilities = np.vstack(probabilities)
+        df["sentiment_raw"] = labels
+        df["prob_negative"] = probabilities[:, 0]
+        df["prob_positive"] = probabilities[:, 1]
+        if self.verbose:
+            print("\nRaw sentiment prediction preview:")
+            print(df[["clean_review", "sentiment_raw", "prob_negative", "prob_positive"]].head())
         return df
@@ -0,0 +1,48 @@
+"""
+Agreement report between two SentimentClassifier configurations.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def compare_classifiers(reference, candidate, df: pd.DataFrame,
+                        batch_size: int = 32) -> dict:
+    """
+    Classify the encoded rows of df ('input_ids', 'attention_mask')
+    with both classifiers and report how closely the candidate (e.g.
+    an INT8 quantized model or the ONNX backend) agrees with the
+    reference (e.g. the eager fp32 model).
+
+    The report contains the label agreement rate, the absolute
+    differences in confidence (max probability) and in per-class
+    probabilities, and the throughput of each classifier.
+    """
+    results = {}
+    for name, classifier in (("reference", reference), ("candidate", candidate)):
+        classifier.warmup()
+        start = time.perf_counter()
+        labels, probabilities = classifier.classify_bucketed(
+            df["input_ids"], df["attention_mask"], batch_size
+        )
+        elapsed = time.perf_counter() - start
+        results[name] = (np.array(labels), np.array(probabilities, dtype=np.float64), elapsed)
+
+    ref_labels, ref_probs, ref_time = results["reference"]
+    cand_labels, cand_probs, cand_time = results["candidate"]
+    confidence_diff = np.abs(ref_probs.max(axis=1) - cand_probs.max(axis=1))
+    disagreements = np.flatnonzero(ref_labels != cand_labels)
+
+    return {
+        "rows": len(df),
+        "label_agreement": round(float((ref_labels == cand_labels).mean()), 4),
+        "disagreement_rows": df.index[disagreements].tolist(),
+        "max_confidence_diff": round(float(confidence_diff.max()), 6),
+        "mean_confidence_diff": round(float(confidence_diff.mean()), 6),
+        "max_probability_deviation": round(float(np.abs(ref_probs - cand_probs).max()), 6),
+        "reference_rows_per_sec": round(len(df) / ref_time, 2),
+        "candidate_rows_per_sec": round(len(df) / cand_time, 2),
+        "speedup": round(ref_time / cand_time, 3),
+    }
@@ -8,10 +8,13 @@ import pandas as pd
 class DataLoader:
     """
     Responsible for loading the raw input CSV into a DataFrame.
+
+    verbose=False skips the data preview.
     """
 
-    def __init__(self, input_file: str):
+    def __init__(self, input_file: str, verbose: bool = True):
         self.input_file = input_file
+        self.verbose = verbose
 
     def load(self) -> pd.DataFrame:
         """
@@ -27,6 +30,25 @@ class DataLoader:
             print(f"Error: The file '{self.input_file}' was not found.")
             raise exc
 
-        print("\nOriginal data preview:")
-        print(df.head())
+        if self.verbose:
+            print("\nOriginal data preview:")
+            print(df.head())
         return df
+
+    def iter_chunks(self, chunk_size: int):
+        """
+        Lazily read the CSV file in DataFrames of at most chunk_size
+        rows. Row indices keep counting across chunks.
+
+        Raises:
+            FileNotFoundError: if the file does not exist.
+        """
+        try:
+            reader = pd.read_csv(self.input_file, chunksize=chunk_size)
+            print(f"Streaming CSV file in chunks of {chunk_size} rows...")
+        except FileNotFoundError as exc:
+            print(f"Error: The file '{self.input_file}' was not found.")
+            raise exc
+
+        with reader:
+            yield from reader
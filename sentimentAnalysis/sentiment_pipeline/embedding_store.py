@@ -0,0 +1,293 @@
+"""
+Append-only, memory-mapped store of review embeddings, with exact
+nearest-neighbour search.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+class EmbeddingStore:
+    """
+    Stores one embedding vector per review in a directory of flat
+    binary files that are memory-mapped for reading:
+
+    - vectors.bin  (count, dim) row-major float16 or float32 vectors
+    - ids.bin      int64 review ID of every row
+    - norms.bin    float32 L2 norm of every stored vector
+    - meta.json    dim, dtype, committed row count and free-form info
+
+    Rows are only ever appended. meta.json is rewritten atomically
+    after every append and is the commit point: rows beyond its count
+    (e.g. from an interrupted append) are dropped when the store is
+    opened. A review ID may occur more than once; get() returns its
+    most recently appended vector. append_new() only adds IDs that are
+    not stored yet.
+
+    A new store uses dtype (float16 by default) and records info, e.g.
+    the model and the kind of review IDs. Reopening an existing store
+    with a different dtype or info raises ValueError instead of mixing
+    incompatible vectors.
+    """
+
+    _FILES = {"vectors": "vectors.bin", "ids": "ids.bin", "norms": "norms.bin"}
+
+    def __init__(self, path: str, dtype: str = None, info: dict = None):
+        if dtype not in (None, "float16", "float32"):
+            raise ValueError(f"Unknown dtype '{dtype}', expected 'float16' or 'float32'.")
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        meta_file = os.path.join(path, "meta.json")
+        if os.path.exists(meta_file):
+            with open(meta_file, encoding="utf-8") as fh:
+                self.meta = json.load(fh)
+            if dtype is not None and dtype != self.meta["dtype"]:
+                raise ValueError(f"Embedding store {path} holds {self.meta['dtype']} "
+                                 f"vectors, not {dtype}.")
+            if info is not None and info != self.meta["info"]:
+                raise ValueError(f"Embedding store {path} was built with {self.meta['info']}, "
+                                 f"not {info}.")
+        else:
+            self.meta = {"dim": None, "dtype": dtype or "float16", "count": 0,
+                         "info": info or {}}
+            self._write_meta()
+        self._row_of_id = None
+        self.truncate(len(self))
+
+    def __len__(self) -> int:
+        return self.meta["count"]
+
+    @property
+    def dim(self) -> int:
+        return self.meta["dim"]
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(self.meta["dtype"])
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, self._FILES[name])
+
+    def _write_meta(self) -> None:
+        """
+        Atomically replace meta.json.
+        """
+        meta_file = os.path.join(self.path, "meta.json")
+        tmp_file = f"{meta_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as fh:
+            json.dump(self.meta, fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_file, meta_file)
+
+    def _row_bytes(self) -> dict:
+        """
+        Bytes per row in each data file.
+        """
+        return {"vectors": (self.dim or 0) * self.dtype.itemsize, "ids": 8, "norms": 4}
+
+    def append(self, ids, vectors) -> None:
+        """
+        Append one vector per review ID and commit them.
+
+        Raises:
+            ValueError: if the shapes do not match each other or the
+            dimension of the vectors already stored.
+        """
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        vectors = np.asarray(vectors)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("Expected one vector per ID, as an (n, dim) array.")
+        if not len(ids):
+            return
+        if self.dim is None:
+            self.meta["dim"] = int(vectors.shape[1])
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}.")
+
+        stored = vectors.astype(self.dtype)
+        norms = np.linalg.norm(stored.astype(np.float32), axis=1).astype(np.float32)
+        for name, array in (("vectors", stored), ("ids", ids), ("norms", norms)):
+            with open(self._file(name), "ab") as fh:
+                fh.write(np.ascontiguousarray(array).tobytes())
+                fh.flush()
+                os.fsync(fh.fileno())
+        self.meta["count"] += len(ids)
+        self._write_meta()
+        self._row_of_id = None
+
+    def append_new(self, ids, vectors) -> int:
+        """
+        Append the vectors of the review IDs that are not stored yet
+        (the first one, for an ID given more than once) and return how
+        many were added.
+        """
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        vectors = np.asarray(vectors)
+        first = np.zeros(len(ids), dtype=bool)
+        first[np.unique(ids, return_index=True)[1]] = True
+        new = first & ~self.contains(ids)
+        self.append(ids[new], vectors[new])
+        return int(new.sum())
+
+    def truncate(self, count: int) -> None:
+        """
+        Drop every row after the first count rows, e.g. to roll back
+        to a checkpoint.
+        """
+        row_bytes = self._row_bytes()
+        for name in self._FILES:
+            path = self._file(name)
+            if os.path.exists(path) and os.path.getsize(path) > count * row_bytes[name]:
+                with open(path, "r+b") as fh:
+                    fh.truncate(count * row_bytes[name])
+        if count != len(self):
+            self.meta["count"] = count
+            self._write_meta()
+            self._row_of_id = None
+
+    def _map(self, name: str, dtype, shape) -> np.ndarray:
+        """
+        Memory-map one data file read-only.
+        """
+        if not len(self):
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(self._file(name), dtype=dtype, mode="r", shape=shape)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """
+        All stored vectors as a read-only (count, dim) memory map.
+        """
+        return self._map("vectors", self.dtype, (len(self), self.dim or 0))
+
+    @property
+    def ids(self) -> np.ndarray:
+        """
+        The review ID of every row, memory-mapped.
+        """
+        return self._map("ids", np.int64, (len(self),))
+
+    @property
+    def norms(self) -> np.ndarray:
+        """
+        The L2 norm of every stored vector, memory-mapped.
+        """
+        return self._map("norms", np.float32, (len(self),))
+
+    def _rows_by_id(self) -> dict:
+        """
+        Map each stored review ID to the row of its latest vector.
+        """
+        if self._row_of_id is None:
+            self._row_of_id = {int(review_id): row for row, review_id in enumerate(self.ids)}
+        return self._row_of_id
+
+    def rows(self, ids) -> np.ndarray:
+        """
+        Row numbers holding the latest vector of each review ID.
+
+        Raises:
+            KeyError: if an ID is not in the store.
+        """
+        row_of_id = self._rows_by_id()
+        return np.array([row_of_id[int(review_id)] for review_id in ids], dtype=np.int64)
+
+    def contains(self, ids) -> np.ndarray:
+        """
+        Whether each review ID has a stored vector, as a bool array.
+        """
+        row_of_id = self._rows_by_id()
+        return np.array([int(review_id) in row_of_id for review_id in ids], dtype=bool)
+
+    @staticmethod
+    def content_ids(texts) -> np.ndarray:
+        """
+        Stable int64 review IDs derived from the review texts: the same
+        text always gets the same ID, whatever file or row it is in.
+        """
+        return np.array([
+            int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(),
+                           "little", signed=True)
+            for text in texts
+        ], dtype=np.int64)
+
+    def get(self, ids) -> np.ndarray:
+        """
+        Return the latest stored vectors of the given review IDs as a
+        float32 (n, dim) array.
+        """
+        return np.asarray(self.vectors[self.rows(ids)], dtype=np.float32)
+
+    def index(self, block_size: int = 65_536) -> "ExactScanIndex":
+        """
+        Return an exact nearest-neighbour search over this store.
+        """
+        return ExactScanIndex(self, block_size=block_size)
+
+
+class ExactScanIndex:
+    """
+    Exact cosine-similarity nearest-neighbour search over an
+    EmbeddingStore, by a blocked brute-force scan.
+
+    There is no index structure: every search scans all stored vectors
+    in blocks of block_size rows straight from the memory map, with one
+    matrix product per block and the norms saved at append time. Search
+    time grows linearly with the store; memory stays bounded by the
+    block size.
+    """
+
+    def __init__(self, store: EmbeddingStore, block_size: int = 65_536):
+        self.store = store
+        self.block_size = block_size
+
+    def search(self, queries, k: int = 10):
+        """
+        Find the k stored vectors most similar to each query vector.
+
+        Returns (ids, scores): two (n_queries, k) arrays with review
+        IDs and cosine similarities, most similar first. With fewer
+        than k stored rows, only that many columns are returned.
+        """
+        if not len(self.store):
+            empty = np.empty((len(queries), 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.store.dim)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        vectors, norms = self.store.vectors, self.store.norms
+        k = min(k, len(self.store))
+
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        for start in range(0, len(self.store), self.block_size):
+            end = min(start + self.block_size, len(self.store))
+            block = np.asarray(vectors[start:end], dtype=np.float32)
+            block_scores = (queries @ block.T) / np.maximum(norms[start:end], 1e-12)
+
+            # Keep the k best of the previous best and this block.
+            scores = np.hstack([best_scores, block_scores])
+            block_rows = np.broadcast_to(np.arange(start, end), block_scores.shape)
+            rows = np.hstack([best_rows, block_rows])
+            if scores.shape[1] > k:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, top, axis=1)
+                rows = np.take_along_axis(rows, top, axis=1)
+            best_scores, best_rows = scores, rows
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        return np.asarray(self.store.ids)[best_rows], best_scores
+
+    def similar_to(self, review_id: int, k: int = 10) -> list:
+        """
+        Return up to k (review ID, cosine similarity) pairs for the
+        reviews most similar to review_id, excluding itself.
+        """
+        ids, scores = self.search(self.store.get([review_id]), k=k + 1)
+        return [(int(other), float(score)) for other, score in zip(ids[0], scores[0])
+                if other != review_id][:k]
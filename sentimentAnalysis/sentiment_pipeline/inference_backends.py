@@ -0,0 +1,259 @@
+"""
+Inference backends used by SentimentClassifier.
+
+Each backend turns padded input_ids / attention_mask arrays into a
+torch tensor of logits, and post-processes them in exactly the same
+way through predict().
+
+This module imports torch and transformers, so SentimentClassifier
+only imports it when the model is actually loaded.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+
+import numpy as np
+import torch
+from transformers import BertConfig, BertForSequenceClassification
+
+
+def _cache_path(cache_dir: str, model_name: str, suffix: str) -> str:
+    """
+    Build a filesystem-safe cache file path for a model artifact.
+    """
+    safe_name = re.sub(r"[^A-Za-z0-9._-]+", "_", model_name)
+    return os.path.join(cache_dir, f"{safe_name}{suffix}")
+
+
+def _predict(logits: torch.Tensor):
+    """
+    Turn a batch of logits into a contiguous float32 (batch, 2)
+    probability array and an array of predicted class indices.
+    """
+    probabilities = torch.softmax(logits, dim=1).numpy().astype(np.float32, copy=False)
+    sentiment_idx = torch.argmax(logits, dim=1).numpy()
+    return probabilities, sentiment_idx
+
+
+class TorchBackend:
+    """
+    Eager PyTorch inference, optionally with the Linear layers
+    dynamically quantized to INT8. The quantized weights are cached in
+    cache_dir so later runs skip quantization.
+    """
+
+    name = "torch"
+
+    def __init__(self, model_name: str, quantize: bool = False,
+                 cache_dir: str = "model_cache"):
+        if quantize:
+            self.model = self._load_quantized(model_name, cache_dir)
+        else:
+            self.model = BertForSequenceClassification.from_pretrained(model_name)
+        self.model.eval()
+        self.pad_token_id = self.model.config.pad_token_id or 0
+
+    @classmethod
+    def prepare(cls, model_name: str, quantize: bool = False,
+                cache_dir: str = "model_cache") -> None:
+        """
+        Create the cached INT8 weights, when quantizing and they do not
+        exist yet, so later loads only read a finished file.
+        """
+        if quantize and not os.path.exists(_cache_path(cache_dir, model_name, ".int8.pt")):
+            cls._load_quantized(model_name, cache_dir)
+
+    @staticmethod
+    def _quantize_dynamic(model):
+        """
+        Apply dynamic INT8 quantization to all Linear layers.
+        """
+        return torch.ao.quantization.quantize_dynamic(
+            model.eval(), {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+    @classmethod
+    def _load_quantized(cls, model_name: str, cache_dir: str):
+        """
+        Load the INT8 dynamically quantized model, reusing the cached
+        quantized weights when present and creating them otherwise.
+        """
+        cache_path = _cache_path(cache_dir, model_name, ".int8.pt")
+
+        if os.path.exists(cache_path):
+            print(f"Loading cached INT8 weights from {cache_path}")
+            config = BertConfig.from_pretrained(model_name)
+            model = cls._quantize_dynamic(BertForSequenceClassification(config))
+            model.load_state_dict(torch.load(cache_path))
+            return model
+
+        model = cls._quantize_dynamic(BertForSequenceClassification.from_pretrained(model_name))
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write under a per-process name and rename into place, so a
+        # crash or a parallel writer never leaves a partial file.
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        torch.save(model.state_dict(), tmp_path)
+        os.replace(tmp_path, cache_path)
+        print(f"Cached INT8 weights to {cache_path}")
+        return model
+
+    def logits(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> torch.Tensor:
+        """
+        Run one forward pass over a padded (batch, sequence) batch.
+        """
+        with torch.inference_mode():
+            outputs = self.model(
+                input_ids=torch.as_tensor(input_ids, dtype=torch.long),
+                attention_mask=torch.as_tensor(attention_mask, dtype=torch.long),
+            )
+        return outputs.logits
+
+    def predict(self, input_ids: np.ndarray, attention_mask: np.ndarray,
+                pooling: str = None):
+        """
+        Return (probabilities, class indices) for a padded batch.
+
+        With pooling ("mean" or "pooler") the same forward pass also
+        returns a float32 (batch, hidden) array of review embeddings:
+        the mask-weighted mean of the last hidden states, or BERT's
+        pooled [CLS] output that the classification head reads.
+        """
+        if pooling is None:
+            return _predict(self.logits(input_ids, attention_mask))
+
+        mask = torch.as_tensor(attention_mask, dtype=torch.long)
+        with torch.inference_mode():
+            outputs = self.model.bert(
+                input_ids=torch.as_tensor(input_ids, dtype=torch.long), attention_mask=mask
+            )
+            pooled = outputs.pooler_output
+            logits = self.model.classifier(self.model.dropout(pooled))
+            if pooling == "mean":
+                weights = mask.unsqueeze(-1).to(outputs.last_hidden_state.dtype)
+                pooled = ((outputs.last_hidden_state * weights).sum(dim=1)
+                          / weights.sum(dim=1).clamp(min=1))
+        probabilities, sentiment_idx = _predict(logits)
+        return probabilities, sentiment_idx, pooled.numpy().astype(np.float32, copy=False)
+
+
+class _LogitsOnly(torch.nn.Module):
+    """
+    Wraps a sequence classifier so the exported graph has a single
+    'logits' output.
+    """
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+
+
+class OnnxBackend:
+    """
+    ONNX Runtime inference on CPU. The BERT sequence classifier is
+    exported once with dynamic batch and sequence axes and the export
+    is cached in cache_dir.
+
+    intra_op_threads / inter_op_threads configure the ONNX Runtime
+    thread pools (None keeps the ONNX Runtime defaults).
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_name: str, cache_dir: str = "model_cache",
+                 intra_op_threads: int = None, inter_op_threads: int = None):
+        try:
+            import onnxruntime as ort
+        except ImportError as exc:
+            raise ImportError(
+                "The ONNX backend requires onnxruntime: pip install onnxruntime onnx onnxscript"
+            ) from exc
+
+        self.pad_token_id = BertConfig.from_pretrained(model_name).pad_token_id or 0
+        model_path = self.prepare(model_name, cache_dir)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        if inter_op_threads:
+            options.inter_op_num_threads = inter_op_threads
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+
+    @classmethod
+    def prepare(cls, model_name: str, cache_dir: str = "model_cache") -> str:
+        """
+        Export the model to ONNX unless a finished export is already
+        cached, and return the path of the cached model.
+        """
+        model_path = _cache_path(cache_dir, model_name, ".onnx")
+        if not os.path.exists(model_path):
+            cls._export(model_name, model_path)
+        return model_path
+
+    @staticmethod
+    def _export(model_name: str, model_path: str) -> None:
+        """
+        Export the eager model to ONNX with dynamic batch and sequence
+        axes.
+
+        The export (the .onnx file and its external .onnx.data file, if
+        any) is written to a temporary directory and moved into place
+        afterwards, the .onnx file last, so an interrupted or concurrent
+        export never leaves a truncated model at model_path.
+        """
+        print(f"Exporting {model_name} to ONNX (one-off)...")
+        model = BertForSequenceClassification.from_pretrained(model_name).eval()
+        example_ids = torch.ones((2, 8), dtype=torch.long)
+        batch, sequence = torch.export.Dim("batch"), torch.export.Dim("sequence")
+        cache_dir = os.path.dirname(model_path) or "."
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=".onnx-export-", dir=cache_dir)
+        try:
+            tmp_path = os.path.join(tmp_dir, os.path.basename(model_path))
+            torch.onnx.export(
+                _LogitsOnly(model).eval(),
+                (example_ids, torch.ones_like(example_ids)),
+                tmp_path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["logits"],
+                dynamic_shapes={
+                    "input_ids": {0: batch, 1: sequence},
+                    "attention_mask": {0: batch, 1: sequence},
+                },
+                dynamo=True,
+            )
+            # The .onnx file refers to its side files by name, so they
+            # keep working once moved next to it. It goes last: once it
+            # exists, the export is complete.
+            model_file = os.path.basename(model_path)
+            for name in sorted(os.listdir(tmp_dir), key=lambda name: name == model_file):
+                os.replace(os.path.join(tmp_dir, name), os.path.join(cache_dir, name))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        print(f"Cached ONNX export to {model_path}")
+
+    def logits(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> torch.Tensor:
+        """
+        Run one forward pass over a padded (batch, sequence) batch.
+        """
+        (logits,) = self.session.run(
+            ["logits"],
+            {
+                "input_ids": np.asarray(input_ids, dtype=np.int64),
+                "attention_mask": np.asarray(attention_mask, dtype=np.int64),
+            },
+        )
+        return torch.from_numpy(logits)
+
+    def predict(self, input_ids: np.ndarray, attention_mask: np.ndarray):
+        """
+        Return (probabilities, class indices) for a padded batch.
+        """
+        return _predict(self.logits(input_ids, attention_mask))
@@ -2,48 +2,514 @@
 Pipeline Orchestrator: wires together all stage classes in order.
 """
 
+import json
+import os
+
+import numpy as np
 import pandas as pd
 
 from .data_loader import DataLoader
 from .text_cleaner import TextCleaner
 from .bert_encoder import BertTextEncoder
 from .classifier import SentimentClassifier
+from .sharded_classifier import ShardedClassifier
 from .result_formatter import ResultFormatter
+from .prediction_cache import PredictionCache
+from .cascade import CascadeClassifier
+from .embedding_store import EmbeddingStore
+from .stage_metrics import StageMetrics
+from .startup import startup_report
 
 
 class SentimentPipeline:
     """
     Orchestrates the full end-to-end sentiment analysis pipeline,
     wiring together all the individual stage classes in order.
+
+    Constructing the pipeline is cheap: the tokenizer and model are
+    only loaded when the first batch needs them, or up front through
+    warmup().
+
+    Every stage is timed through self.metrics (wall time, rows/sec and
+    peak RSS, plus tokens/sec and batch sizes for the classifier); see
+    metrics_report(). metrics_file additionally receives one JSON line
+    per stage run. stage_peak_rss=True (Linux) resets the process's
+    peak RSS as each stage starts, to record per-stage peaks instead of
+    the running peak. quiet=True turns off the per-stage data previews.
+
+    model_name / tokenizer_name override the default IMDB classifier
+    and bert-base-uncased tokenizer, e.g. with local directories.
+
+    With a cascade (a fitted CascadeClassifier or the path of a saved
+    one, see fit_cascade()), every review is first scored by the cheap
+    TF-IDF model and only reviews below its confidence threshold go
+    through BERT. cascade_audit_rate sends that fraction of the
+    cascade-answered rows through BERT as well, to measure agreement
+    with BERT-only results; see cascade_report().
+
+    With embedding_store (a directory), every review answered by BERT
+    (including cache hits and duplicates) also has its pooled embedding
+    stored in an EmbeddingStore, once per distinct cleaned review. Its
+    review ID is a hash of the cleaned text (EmbeddingStore.content_ids)
+    and is added as the 'embedding_id' column; see self.embeddings.
     """
 
     def __init__(self,
                  input_file: str = "movie_reviews.csv",
                  predictions_file: str = "predictions.csv",
                  output_file: str = "result.csv",
-                 max_len: int = 64):
+                 max_len: int = 64,
+                 batch_size: int = None,
+                 fast_tokenizer: bool = False,
+                 debug_tokens: bool = False,
+                 dynamic_padding: bool = False,
+                 checkpoint_file: str = None,
+                 cache_file: str = None,
+                 cache_size: int = 100_000,
+                 deduplicate: bool = False,
+                 quantize: bool = False,
+                 backend: str = "torch",
+                 intra_op_threads: int = None,
+                 inter_op_threads: int = None,
+                 n_workers: int = 1,
+                 threads_per_worker: int = 1,
+                 output_format: str = "csv",
+                 debug_columns=None,
+                 clean_workers: int = 1,
+                 quiet: bool = False,
+                 metrics_file: str = None,
+                 stage_peak_rss: bool = False,
+                 model_name: str = None,
+                 tokenizer_name: str = None,
+                 cascade=None,
+                 cascade_audit_rate: float = 0.0,
+                 embedding_store: str = None,
+                 embedding_dtype: str = None,
+                 embedding_pooling: str = "mean"):
         self.input_file = input_file
         self.predictions_file = predictions_file
         self.output_file = output_file
+        self.fast_tokenizer = fast_tokenizer
+        self.debug_tokens = debug_tokens
+        self.dynamic_padding = dynamic_padding
+        self.checkpoint_file = checkpoint_file or f"{predictions_file}.checkpoint.json"
+        self.quiet = quiet
+        self.metrics = StageMetrics(metrics_file, reset_peak=stage_peak_rss)
+
+        verbose = not quiet
+        self.loader = DataLoader(input_file, verbose=verbose)
+        self.cleaner = TextCleaner(n_jobs=clean_workers, verbose=verbose)
+        encoder_kwargs = {"model_name": tokenizer_name} if tokenizer_name else {}
+        self.encoder = BertTextEncoder(max_len=max_len, use_fast=fast_tokenizer, verbose=verbose,
+                                       **encoder_kwargs)
+        classifier_kwargs = {"model_name": model_name} if model_name else {}
+        classifier_kwargs.update({
+            "batch_size": batch_size, "quantize": quantize, "backend": backend,
+            "intra_op_threads": intra_op_threads, "inter_op_threads": inter_op_threads,
+            "verbose": verbose,
+        })
+        self.embeddings = None
+        if embedding_store:
+            self.embeddings = EmbeddingStore(
+                embedding_store, dtype=embedding_dtype,
+                info={"model_name": model_name or SentimentClassifier.DEFAULT_MODEL,
+                      "max_len": max_len, "pooling": embedding_pooling,
+                      "ids": "blake2b-64(clean_review)"},
+            )
+            classifier_kwargs.update(embedding_store=self.embeddings,
+                                     embedding_pooling=embedding_pooling)
+        if n_workers > 1:
+            self.classifier = ShardedClassifier(
+                n_workers=n_workers, threads_per_worker=threads_per_worker,
+                **classifier_kwargs,
+            )
+        else:
+            self.classifier = SentimentClassifier(**classifier_kwargs)
+        self.formatter = ResultFormatter(output_format=output_format,
+                                         debug_columns=debug_columns, verbose=verbose)
+
+        self.cache = None
+        if cache_file:
+            self.cache = PredictionCache(cache_file, self.classifier.model_name,
+                                         max_len, max_entries=cache_size,
+                                         tokenizer_name=self.encoder.model_name,
+                                         quantize=quantize, backend=backend)
+        self.deduplicate = deduplicate or self.cache is not None
+
+        if isinstance(cascade, str):
+            cascade = CascadeClassifier.load(cascade)
+        self.cascade = cascade
+        self.cascade_audit_rate = cascade_audit_rate
+        self.cascade_counts = {"rows": 0, "cascade_rows": 0, "bert_rows": 0,
+                               "audited_rows": 0, "audit_agreements": 0}
+        self._audit_rng = np.random.default_rng(0)
+
+    def _encode(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Run Steps 3-5 in the configured encoding mode.
+        """
+        if self.dynamic_padding:
+            return self.encoder.encode_dataframe_dynamic(
+                df, batch_size=self.classifier.batch_size or 1,
+                debug_tokens=self.debug_tokens,
+            )
+        if self.fast_tokenizer:
+            return self.encoder.encode_dataframe_fast(df, debug_tokens=self.debug_tokens)
+        df = self.encoder.tokenize_dataframe(df)       # Step 3
+        df = self.encoder.tokens_to_ids_dataframe(df)  # Step 4
+        return self.encoder.encode_dataframe(df)       # Step 5
 
-        self.loader = DataLoader(input_file)
-        self.cleaner = TextCleaner()
-        self.encoder = BertTextEncoder(max_len=max_len)
-        self.classifier = SentimentClassifier()
-        self.formatter = ResultFormatter()
+    def _encode_and_classify(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Run Steps 3-6, recording the encode and classify stages. The
+        classify stage also records real tokens and batch sizes.
+        """
+        with self.metrics.stage("encode", len(df)):
+            df = self._encode(df)                      # Steps 3-5
+        with self.metrics.stage("classify", len(df)) as record:
+            tokens = self.classifier.tokens_classified
+            batch_sizes = self.classifier.batch_sizes.copy()
+            worker_stats = getattr(self.classifier, "worker_stats", None)
+            df = self.classifier.classify_dataframe(df)  # Step 6
+            record["tokens"] = self.classifier.tokens_classified - tokens
+            record["batch_sizes"] = self.classifier.batch_sizes - batch_sizes
+            if getattr(self.classifier, "worker_stats", None) is not worker_stats:
+                record["worker_peaks"] = {
+                    pid: stats["peak_rss_mb"]
+                    for pid, stats in self.classifier.worker_stats["workers"].items()
+                }
+        return df
+
+    def _encoded_columns(self) -> list:
+        """
+        Columns added by _encode() in the configured encoding mode.
+        """
+        columns = ["input_ids", "attention_mask"]
+        if self.debug_tokens or not (self.dynamic_padding or self.fast_tokenizer):
+            columns = ["tokens", "token_ids"] + columns
+        return columns
+
+    def _classify_unique(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Run Steps 3-6 only on distinct cleaned reviews that are not
+        already in the prediction cache, then fan the results back out
+        to every row.
+
+        Rows answered from the cache have no encoder debug columns;
+        those cells are left empty.
+
+        With an embedding store, cached rows whose review has no stored
+        embedding yet also go through BERT.
+        """
+        if self.cache is not None:
+            keys = df["clean_review"].map(self.cache.key)
+            known = self.cache.get_many(keys.unique())
+        else:
+            keys = df["clean_review"]
+            known = {}
+
+        needs_inference = ~keys.isin(known)
+        if self.embeddings is not None:
+            needs_inference |= ~self.embeddings.contains(df["embedding_id"])
+        misses = df.loc[needs_inference]
+        misses = misses.loc[~keys[misses.index].duplicated()].copy()
+        print(f"\n{len(df)} rows, {len(misses)} distinct reviews need inference.")
+
+        if len(misses):
+            misses = self._encode_and_classify(misses)
+            miss_keys = keys[misses.index]
+            miss_probs = misses[["prob_negative", "prob_positive"]].to_numpy(dtype=np.float32)
+            predicted = dict(zip(miss_keys, zip(misses["sentiment_raw"], miss_probs)))
+            if self.cache is not None:
+                self.cache.put_many(predicted)
+            known.update(predicted)
+
+        for column in self._encoded_columns():
+            if column in misses:
+                df[column] = keys.map(pd.Series(misses[column].values, index=miss_keys))
+            else:
+                df[column] = None
+        # Fan out per distinct key, then gather rows with one index array.
+        known_keys = list(known)
+        labels = np.array([known[key][0] for key in known_keys], dtype=object)
+        probabilities = np.array([known[key][1] for key in known_keys],
+                                 dtype=np.float32).reshape(-1, 2)
+        rows = pd.Index(known_keys).get_indexer(keys)
+        df["sentiment_raw"] = labels[rows]
+        df["prob_negative"] = probabilities[rows, 0]
+        df["prob_positive"] = probabilities[rows, 1]
+
+        if self.cache is not None:
+            print(f"Prediction cache: {self.cache.stats()}")
+        return df
+
+    def _classify_bert(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Run Steps 3-6 through BERT, deduplicating first if enabled.
+        """
+        if self.deduplicate:
+            return self._classify_unique(df)
+        return self._encode_and_classify(df)
+
+    def _classify_cascade(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Answer confident rows with the cascade and send the rest (plus
+        the audit sample) through BERT, then merge both tiers back in
+        the original row order. The 'tier' column records which model
+        produced each row's prediction; cascade-answered rows have no
+        encoder columns, those cells are left empty.
+        """
+        with self.metrics.stage("cascade", len(df)):
+            probabilities = self.cascade.predict_proba(df["clean_review"])
+            confident = probabilities.max(axis=1) >= self.cascade.threshold
+            audited = confident & (self._audit_rng.random(len(df)) < self.cascade_audit_rate)
+
+        # Every chunk gets the same columns in the same order, whichever
+        # tiers answered it, so streamed output keeps one schema.
+        columns = (list(df.columns) + self._encoded_columns()
+                   + ["sentiment_raw", "prob_negative", "prob_positive", "tier"])
+
+        cheap = df.loc[confident].copy()
+        for column in self._encoded_columns():
+            cheap[column] = None
+        cheap["sentiment_raw"] = self.cascade.labels(probabilities[confident])
+        cheap["prob_negative"] = probabilities[confident, 0]
+        cheap["prob_positive"] = probabilities[confident, 1]
+        cheap["tier"] = "cascade"
+
+        parts = [cheap]
+        if (~confident | audited).any():
+            bert = self._classify_bert(df.loc[~confident | audited].copy())
+            bert["tier"] = "bert"
+            audit_index = df.index[audited]
+            agreements = int((bert.loc[audit_index, "sentiment_raw"]
+                              == cheap.loc[audit_index, "sentiment_raw"]).sum())
+            self.cascade_counts["audit_agreements"] += agreements
+            parts.append(bert.drop(index=audit_index))
+        df = pd.concat(parts).loc[df.index, columns]
+
+        self.cascade_counts["rows"] += len(df)
+        self.cascade_counts["cascade_rows"] += int(confident.sum())
+        self.cascade_counts["bert_rows"] += int((~confident).sum())
+        self.cascade_counts["audited_rows"] += int(audited.sum())
+        print(f"\nCascade: {self.cascade_report()}")
+        return df
+
+    def cascade_report(self) -> dict:
+        """
+        Return the share of rows answered by each tier so far and,
+        when auditing, the cascade's agreement with BERT.
+        """
+        counts = self.cascade_counts
+        rows = counts["rows"] or 1
+        report = {
+            "rows": counts["rows"],
+            "threshold": self.cascade.threshold if self.cascade is not None else None,
+            "cascade_share": round(counts["cascade_rows"] / rows, 4),
+            "bert_share": round(counts["bert_rows"] / rows, 4),
+            "audited_rows": counts["audited_rows"],
+        }
+        if counts["audited_rows"]:
+            cascade_agreement = counts["audit_agreements"] / counts["audited_rows"]
+            report["cascade_agreement"] = round(cascade_agreement, 4)
+            # BERT-tier rows agree with BERT-only results by definition.
+            report["estimated_overall_agreement"] = round(
+                (counts["cascade_rows"] * cascade_agreement + counts["bert_rows"]) / rows, 4
+            )
+        return report
+
+    def fit_cascade(self, sample_size: int = 10_000, holdout: float = 0.2,
+                    threshold: float = 0.9, seed: int = 0) -> list:
+        """
+        Train a CascadeClassifier against this pipeline's own BERT
+        outputs and enable cascade mode with it.
+
+        A random sample of sample_size input rows is cleaned and
+        classified by BERT; the cascade is fitted on all but the
+        holdout fraction. Returns the cascade's threshold_report() on
+        the held-out rows, to choose a threshold from (it can be
+        changed later through self.cascade.threshold).
+        """
+        df = self.loader.load()
+        df = df.sample(n=min(sample_size, len(df)), random_state=seed)
+        df = self.cleaner.clean_dataframe(df)
+        # The calibration sample is not part of the run's output, so its
+        # embeddings are not stored.
+        embeddings, self.embeddings = self.embeddings, None
+        self.classifier.embedding_store = None
+        try:
+            df = self._classify_bert(df)
+        finally:
+            self.embeddings = self.classifier.embedding_store = embeddings
+
+        n_holdout = int(len(df) * holdout)
+        train, test = df.iloc[n_holdout:], df.iloc[:n_holdout]
+        self.cascade = CascadeClassifier(threshold=threshold).fit(
+            train["clean_review"], train["sentiment_raw"]
+        )
+        report = []
+        if len(test):
+            report = self.cascade.threshold_report(test["clean_review"], test["sentiment_raw"])
+            print(f"\nCascade thresholds on {len(test)} held-out rows: {report}")
+        return report
+
+    def process(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Run Steps 2-7 on an already loaded DataFrame and return it
+        with all intermediate and final columns added.
+
+        With deduplication (or a prediction cache) enabled, only
+        distinct, uncached reviews go through Steps 3-6. In cascade
+        mode only reviews the cascade is unsure about do.
+        """
+        with self.metrics.stage("clean", len(df)) as record:
+            df = self.cleaner.clean_dataframe(df)      # Step 2
+            record["worker_peaks"] = self.cleaner.worker_peaks
+            if self.embeddings is not None:
+                df["embedding_id"] = EmbeddingStore.content_ids(df["clean_review"])
+        if self.cascade is not None:
+            df = self._classify_cascade(df)            # Steps 3-6
+        else:
+            df = self._classify_bert(df)               # Steps 3-6
+        with self.metrics.stage("format", len(df)):
+            df = self.formatter.format_dataframe(df)   # Step 7
+        return df
 
     def run(self) -> pd.DataFrame:
         """
         Execute all pipeline steps in sequence and return the
         final DataFrame containing all intermediate and final columns.
         """
-        df = self.loader.load()                       # Step 1
-        df = self.cleaner.clean_dataframe(df)          # Step 2
-        df = self.encoder.tokenize_dataframe(df)       # Step 3
-        df = self.encoder.tokens_to_ids_dataframe(df)  # Step 4
-        df = self.encoder.encode_dataframe(df)         # Step 5
-        df = self.classifier.classify_dataframe(df)    # Step 6
-        df = self.formatter.format_dataframe(df)       # Step 7
+        with self.metrics.stage("load") as record:
+            df = self.loader.load()                    # Step 1
+            record["rows"] = len(df)
+        df = self.process(df)                          # Steps 2-7
 
-        self.formatter.save(df, self.predictions_file, self.output_file)
+        with self.metrics.stage("save", len(df)):
+            self.formatter.save(df, self.predictions_file, self.output_file)
+        self.metrics_report()
         return df
+
+    def warmup(self) -> dict:
+        """
+        Load the tokenizer and model and run one dummy batch through
+        them, then return the startup-time report.
+        """
+        self.encoder.warmup()
+        self.classifier.warmup()
+        return self.startup_report()
+
+    @staticmethod
+    def startup_report() -> dict:
+        """
+        Print and return where import and model-load time went so far.
+        """
+        report = startup_report()
+        print(f"\nStartup time (seconds): {report}")
+        return report
+
+    def metrics_report(self) -> dict:
+        """
+        Return the per-stage metrics recorded so far, printing them
+        unless quiet.
+        """
+        report = self.metrics.report()
+        if not self.quiet:
+            print(f"\nStage metrics: {report}")
+        return report
+
+    def close(self) -> None:
+        """
+        Release worker processes and the prediction cache, if any.
+        """
+        if isinstance(self.classifier, ShardedClassifier):
+            self.classifier.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    # ---------------- Streaming mode ----------------
+    def _load_checkpoint(self, chunk_size: int) -> dict:
+        """
+        Return the checkpoint of an interrupted streaming run over the
+        same input and chunk size, or None if there is nothing to resume.
+        """
+        if not os.path.exists(self.checkpoint_file):
+            return None
+        with open(self.checkpoint_file, encoding="utf-8") as fh:
+            checkpoint = json.load(fh)
+        if (checkpoint.get("input_file") != self.input_file
+                or checkpoint.get("chunk_size") != chunk_size):
+            print(f"Ignoring checkpoint {self.checkpoint_file}: it belongs to a different run.")
+            return None
+        return checkpoint
+
+    def _commit_checkpoint(self, checkpoint: dict) -> None:
+        """
+        Atomically record the progress of a streaming run, including
+        the state of both outputs (and of the embedding store) after
+        the last committed chunk.
+        """
+        checkpoint["output_state"] = self.formatter.output_state(
+            self.predictions_file, self.output_file
+        )
+        if self.embeddings is not None:
+            checkpoint["output_state"]["embedding_rows"] = len(self.embeddings)
+        tmp_file = f"{self.checkpoint_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as fh:
+            json.dump(checkpoint, fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_file, self.checkpoint_file)
+
+    def run_streaming(self, chunk_size: int = 1000, resume: bool = True) -> dict:
+        """
+        Execute the pipeline chunk by chunk: each chunk of at most
+        chunk_size rows is read, processed through Steps 2-7 and
+        appended to predictions_file/output_file before the next one
+        is read, so memory stays bounded by the chunk size.
+
+        Progress is committed to checkpoint_file after every chunk.
+        With resume=True an interrupted run continues after its last
+        committed chunk; any partially written rows beyond that point
+        are dropped first. Otherwise both outputs are overwritten.
+
+        With Parquet output, output_file is a dataset directory holding
+        one part file (a single row group) per chunk.
+
+        Stage metrics accumulate across chunks; reading the input is
+        not timed separately in this mode.
+
+        Returns a summary with the number of chunks and rows written.
+        """
+        checkpoint = self._load_checkpoint(chunk_size) if resume else None
+        if checkpoint is None:
+            checkpoint = {"input_file": self.input_file, "chunk_size": chunk_size,
+                          "chunks_done": 0, "rows_done": 0}
+            self.formatter.reset_output(self.predictions_file, self.output_file)
+        else:
+            print(f"Resuming after chunk {checkpoint['chunks_done']} "
+                  f"({checkpoint['rows_done']} rows already written).")
+            self.formatter.rollback_output(self.predictions_file, self.output_file,
+                                           checkpoint["output_state"])
+            if self.embeddings is not None and "embedding_rows" in checkpoint["output_state"]:
+                self.embeddings.truncate(checkpoint["output_state"]["embedding_rows"])
+
+        for chunk_no, df in enumerate(self.loader.iter_chunks(chunk_size)):
+            if chunk_no < checkpoint["chunks_done"]:
+                continue
+
+            df = self.process(df)                      # Steps 2-7
+            with self.metrics.stage("save", len(df)):
+                self.formatter.append(df, self.predictions_file, self.output_file, chunk_no)
+
+            checkpoint["chunks_done"] = chunk_no + 1
+            checkpoint["rows_done"] += len(df)
+            self._commit_checkpoint(checkpoint)
+            print(f"\nCommitted chunk {chunk_no + 1} ({checkpoint['rows_done']} rows total).")
+
+        if os.path.exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
+        print(f"\nHuman-readable predictions saved to {self.predictions_file}")
+        print(f"Full result saved to {self.output_file}")
+        self.metrics_report()
+        return {"chunks": checkpoint["chunks_done"], "rows": checkpoint["rows_done"]}
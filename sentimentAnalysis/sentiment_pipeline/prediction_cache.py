@@ -0,0 +1,135 @@
+"""
+Persistent on-disk cache of sentiment predictions.
+"""
+
+import hashlib
+import sqlite3
+
+
+class PredictionCache:
+    """
+    Stores raw sentiment predictions in a SQLite file, keyed by a hash
+    of the cleaned review text together with everything that affects
+    the prediction: model name, tokenizer name, max_len, whether the
+    model is INT8-quantized and the inference backend.
+
+    The cache holds at most max_entries predictions; when it grows
+    beyond that, the least recently used entries are evicted. Hit and
+    miss counters are kept for the lifetime of the object.
+    """
+
+    _BATCH = 500
+
+    def __init__(self, path: str, model_name: str, max_len: int,
+                 max_entries: int = 100_000, tokenizer_name: str = None,
+                 quantize: bool = False, backend: str = "torch"):
+        self.path = path
+        self.model_name = model_name
+        self.max_len = max_len
+        self.tokenizer_name = tokenizer_name
+        self.quantize = quantize
+        self.backend = backend
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            " key TEXT PRIMARY KEY,"
+            " label TEXT NOT NULL,"
+            " prob_negative REAL NOT NULL,"
+            " prob_positive REAL NOT NULL,"
+            " last_used INTEGER NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS predictions_last_used ON predictions (last_used)"
+        )
+        self.conn.commit()
+        self._clock = self.conn.execute(
+            "SELECT COALESCE(MAX(last_used), 0) FROM predictions"
+        ).fetchone()[0]
+
+    def key(self, clean_text: str) -> str:
+        """
+        Build the cache key for a cleaned review text.
+        """
+        raw = (f"{self.model_name}\0{self.tokenizer_name}\0{self.max_len}\0"
+               f"{'int8' if self.quantize else 'fp32'}\0{self.backend}\0{clean_text}")
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def get_many(self, keys) -> dict:
+        """
+        Look up many keys at once and return a dict mapping each
+        cached key to its (label, probabilities) pair. Hits are
+        marked as most recently used.
+        """
+        keys = list(keys)
+        found = {}
+        for start in range(0, len(keys), self._BATCH):
+            batch = keys[start:start + self._BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(
+                "SELECT key, label, prob_negative, prob_positive FROM predictions"
+                f" WHERE key IN ({placeholders})",
+                batch,
+            ).fetchall()
+            for key, label, prob_negative, prob_positive in rows:
+                found[key] = (label, [prob_negative, prob_positive])
+
+        stamp = self._tick()
+        self.conn.executemany(
+            "UPDATE predictions SET last_used = ? WHERE key = ?",
+            ((stamp, key) for key in found),
+        )
+        self.conn.commit()
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, predictions: dict) -> None:
+        """
+        Store a dict mapping keys to (label, probabilities) pairs, then
+        evict the least recently used entries beyond max_entries.
+        """
+        stamp = self._tick()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO predictions"
+            " (key, label, prob_negative, prob_positive, last_used)"
+            " VALUES (?, ?, ?, ?, ?)",
+            ((key, label, float(probs[0]), float(probs[1]), stamp)
+             for key, (label, probs) in predictions.items()),
+        )
+        self.conn.execute(
+            "DELETE FROM predictions WHERE key IN ("
+            " SELECT key FROM predictions ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self.conn.commit()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+    def stats(self) -> dict:
+        """
+        Return the hit/miss counters and current size of the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+        }
+
+    def close(self) -> None:
+        """
+        Close the underlying SQLite connection.
+        """
+        self.conn.close()
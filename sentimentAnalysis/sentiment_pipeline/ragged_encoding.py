@@ -0,0 +1,66 @@
+"""
+Compact storage for unpadded (dynamic-padding) BERT encodings.
+"""
+
+import numpy as np
+
+
+class RaggedEncoding:
+    """
+    Holds the unpadded input IDs of many rows as one flat array plus
+    row offsets, so row i spans values[offsets[i]:offsets[i + 1]].
+
+    The attention mask of an unpadded row is all ones, so it is not
+    stored: attention_rows() hands out views into a single shared
+    buffer instead.
+    """
+
+    def __init__(self, values: np.ndarray, offsets: np.ndarray):
+        self.values = values
+        self.offsets = offsets
+
+    @classmethod
+    def from_lists(cls, rows) -> "RaggedEncoding":
+        """
+        Build a RaggedEncoding from a list of per-row ID lists.
+        """
+        lengths = np.fromiter((len(row) for row in rows), dtype=np.int64, count=len(rows))
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        values = np.fromiter(
+            (token_id for row in rows for token_id in row),
+            dtype=np.int64,
+            count=int(offsets[-1]),
+        )
+        return cls(values, offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """
+        Number of real tokens in each row.
+        """
+        return np.diff(self.offsets)
+
+    def row(self, i: int) -> np.ndarray:
+        """
+        Return the input IDs of row i as a view into the flat array.
+        """
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+    def rows(self):
+        """
+        Return the input IDs of every row as a list of views.
+        """
+        return [self.row(i) for i in range(len(self))]
+
+    def attention_rows(self):
+        """
+        Return an all-ones attention mask per row, each a view into
+        one shared buffer as long as the longest row.
+        """
+        ones = np.ones(int(self.lengths.max()) if len(self) else 0, dtype=np.int64)
+        ones.setflags(write=False)
+        return [ones[:length] for length in self.lengths]
@@ -2,6 +2,11 @@
 Step 7: Produce final clean sentiment output and save results.
 """
 
+import glob
+import os
+import shutil
+
+import numpy as np
 import pandas as pd
 
 
@@ -9,8 +14,43 @@ class ResultFormatter:
     """
     Formats raw model output into a clean, human-readable sentiment
     string and handles saving results to disk.
+
+    The predictions file is always CSV. The full debug/log dataset is
+    written as CSV (output_format="csv", the default) or as typed,
+    compressed Parquet (output_format="parquet") with list columns
+    stored natively. debug_columns selects which columns besides
+    'review' and 'final_sentiment' go into the full dataset; None
+    keeps every column.
+
+    Probabilities arrive as the float32 'prob_negative' /
+    'prob_positive' columns. The list-valued 'probabilities' column
+    is only built when the full dataset includes it.
+
+    verbose=False skips the data preview.
     """
 
+    PREDICTION_COLUMNS = ["review", "final_sentiment"]
+    PROBABILITY_COLUMNS = ["prob_negative", "prob_positive"]
+
+    # Compact Arrow types for the list-valued debug columns.
+    LIST_COLUMN_TYPES = {
+        "tokens": "string",
+        "token_ids": "int32",
+        "input_ids": "int32",
+        "attention_mask": "int8",
+        "probabilities": "float32",
+    }
+
+    def __init__(self, output_format: str = "csv", debug_columns=None,
+                 compression: str = "zstd", verbose: bool = True):
+        if output_format not in ("csv", "parquet"):
+            raise ValueError(f"Unknown output_format '{output_format}', "
+                             "expected 'csv' or 'parquet'.")
+        self.output_format = output_format
+        self.debug_columns = debug_columns
+        self.compression = compression
+        self.verbose = verbose
+
     @staticmethod
     def final_prediction(label, probabilities) -> str:
         """
@@ -21,29 +61,182 @@ class ResultFormatter:
         confidence = round(max(positive_prob, negative_prob) * 100, 2)
         return f"{label} ({confidence}%)"
 
+    @staticmethod
+    def final_predictions(labels, probabilities) -> list:
+        """
+        Bulk version of final_prediction() for a sequence of labels
+        and an (n, 2) probability array. Confidences are computed in
+        one NumPy pass; the strings match final_prediction() exactly.
+        """
+        probabilities = np.asarray(probabilities).reshape(-1, 2)
+        confidence = np.round(probabilities.max(axis=1).astype(np.float64) * 100, 2)
+        return [f"{label} ({conf}%)" for label, conf in zip(labels, confidence.tolist())]
+
+    @classmethod
+    def probabilities(cls, df: pd.DataFrame) -> np.ndarray:
+        """
+        Return the probability columns as a float32 (n, 2) array.
+        """
+        return df[cls.PROBABILITY_COLUMNS].to_numpy(dtype=np.float32)
+
     def format_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
         """
-        Apply final_prediction() row-wise, producing the
-        'final_sentiment' column.
+        Produce the 'final_sentiment' column for all rows at once
+        with final_predictions().
         """
-        df["final_sentiment"] = df.apply(
-            lambda row: self.final_prediction(row["sentiment_raw"], row["probabilities"]),
-            axis=1
-        )
-        print("\nFinal sentiment prediction preview:")
-        print(df[["clean_review", "final_sentiment"]].head())
+        df["final_sentiment"] = self.final_predictions(df["sentiment_raw"],
+                                                       self.probabilities(df))
+        if self.verbose:
+            print("\nFinal sentiment prediction preview:")
+            print(df[["clean_review", "final_sentiment"]].head())
         return df
 
-    @staticmethod
-    def save(df: pd.DataFrame, predictions_file: str, full_output_file: str) -> None:
+    # ---------------- Full output ----------------
+    def _with_probability_lists(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Replace the probability columns with a single list-valued
+        'probabilities' column, as in the original full output.
+        """
+        if not set(self.PROBABILITY_COLUMNS) <= set(df.columns):
+            return df
+        position = df.columns.get_loc(self.PROBABILITY_COLUMNS[0])
+        out = df.drop(columns=self.PROBABILITY_COLUMNS)
+        out.insert(position, "probabilities", self.probabilities(df).tolist())
+        return out
+
+    def _full_output(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Select the columns kept in the full debug/log dataset.
+        """
+        if self.debug_columns is None:
+            return self._with_probability_lists(df)
+        if "probabilities" in self.debug_columns:
+            df = self._with_probability_lists(df)
+        keep = set(self.PREDICTION_COLUMNS) | set(self.debug_columns)
+        return df[[column for column in df.columns if column in keep]]
+
+    def _to_arrow(self, df: pd.DataFrame):
+        """
+        Convert a DataFrame to an Arrow table, storing the known list
+        columns with compact native list types.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError as exc:
+            raise ImportError("Parquet output requires pyarrow: pip install pyarrow") from exc
+
+        columns = {}
+        for name in df.columns:
+            values = df[name]
+            if name in self.LIST_COLUMN_TYPES:
+                value_type = pa.type_for_alias(self.LIST_COLUMN_TYPES[name])
+                columns[name] = pa.array(
+                    [None if not hasattr(v, "__len__") else list(v) for v in values],
+                    type=pa.list_(value_type),
+                )
+            else:
+                columns[name] = pa.Array.from_pandas(values)
+        return pa.table(columns)
+
+    def _write_parquet(self, df: pd.DataFrame, path: str) -> None:
+        """
+        Write a DataFrame as a single Parquet row group.
+        """
+        table = self._to_arrow(df)
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, path, compression=self.compression,
+                       row_group_size=max(len(df), 1))
+
+    def save(self, df: pd.DataFrame, predictions_file: str, full_output_file: str) -> None:
         """
         Save both the simplified human-readable predictions file
         and the full debug/log dataset.
         """
         # Save simplified predictions file
-        df[["review", "final_sentiment"]].to_csv(predictions_file, index=False)
+        df[self.PREDICTION_COLUMNS].to_csv(predictions_file, index=False)
         print(f"\nHuman-readable predictions saved to {predictions_file}")
 
         # Save the full dataset for debugging
-        df.to_csv(full_output_file, index=False)
+        if self.output_format == "parquet":
+            self._write_parquet(self._full_output(df), full_output_file)
+        else:
+            self._full_output(df).to_csv(full_output_file, index=False)
         print(f"Full result saved to {full_output_file}")
+
+    # ---------------- Chunked output ----------------
+    @staticmethod
+    def _append_csv(df: pd.DataFrame, path: str) -> None:
+        """
+        Append rows to a CSV file, writing the header only when the
+        file is new or empty.
+        """
+        header = not os.path.exists(path) or os.path.getsize(path) == 0
+        df.to_csv(path, mode="a", header=header, index=False)
+
+    @staticmethod
+    def _part_file(full_output_file: str, chunk_no: int) -> str:
+        """
+        Path of the Parquet part file holding chunk chunk_no.
+        """
+        return os.path.join(full_output_file, f"part-{chunk_no:05d}.parquet")
+
+    def append(self, df: pd.DataFrame, predictions_file: str, full_output_file: str,
+               chunk_no: int = 0) -> None:
+        """
+        Append one chunk of results to both the predictions file and
+        the full debug/log dataset.
+
+        In Parquet mode full_output_file is a dataset directory and
+        each chunk becomes one row group in its own part file, so
+        pd.read_parquet(full_output_file) reads all chunks in order.
+        """
+        self._append_csv(df[self.PREDICTION_COLUMNS], predictions_file)
+        if self.output_format == "parquet":
+            os.makedirs(full_output_file, exist_ok=True)
+            self._write_parquet(self._full_output(df), self._part_file(full_output_file, chunk_no))
+        else:
+            self._append_csv(self._full_output(df), full_output_file)
+
+    def reset_output(self, predictions_file: str, full_output_file: str) -> None:
+        """
+        Empty both outputs before a fresh chunked run.
+        """
+        open(predictions_file, "w", encoding="utf-8").close()
+        if self.output_format == "parquet":
+            if os.path.isdir(full_output_file):
+                shutil.rmtree(full_output_file)
+            elif os.path.exists(full_output_file):
+                os.remove(full_output_file)
+            os.makedirs(full_output_file)
+        else:
+            open(full_output_file, "w", encoding="utf-8").close()
+
+    def output_state(self, predictions_file: str, full_output_file: str) -> dict:
+        """
+        Describe how much has been written to both outputs, so a
+        later rollback_output() can restore exactly this point.
+        """
+        state = {"predictions_bytes": os.path.getsize(predictions_file)}
+        if self.output_format == "parquet":
+            state["output_parts"] = len(glob.glob(os.path.join(full_output_file, "part-*.parquet")))
+        else:
+            state["output_bytes"] = os.path.getsize(full_output_file)
+        return state
+
+    def rollback_output(self, predictions_file: str, full_output_file: str,
+                        state: dict) -> None:
+        """
+        Drop anything written to both outputs after output_state()
+        returned state.
+        """
+        with open(predictions_file, "r+b") as fh:
+            fh.truncate(state["predictions_bytes"])
+        if self.output_format == "parquet":
+            os.makedirs(full_output_file, exist_ok=True)
+            for path in sorted(glob.glob(os.path.join(full_output_file, "part-*.parquet"))):
+                if int(os.path.basename(path)[5:10]) >= state["output_parts"]:
+                    os.remove(path)
+        else:
+            with open(full_output_file, "r+b") as fh:
+                fh.truncate(state["output_bytes"])
@@ -0,0 +1,282 @@
+"""
+Long-running asyncio HTTP service with request micro-batching.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .text_cleaner import TextCleaner
+from .bert_encoder import BertTextEncoder
+from .classifier import SentimentClassifier
+from .result_formatter import ResultFormatter
+
+# Reason phrases of the HTTP status codes the service returns.
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+            413: "Payload Too Large", 500: "Internal Server Error",
+            503: "Service Unavailable"}
+
+
+class ServiceOverloaded(Exception):
+    """
+    Raised when the request queue is full and a request is rejected.
+    """
+
+
+class SentimentService:
+    """
+    Loads the encoder and classifier once, at startup through warmup(),
+    and serves predictions over a minimal local HTTP/1.1 API:
+
+    - POST /predict  {"review": "..."} or {"reviews": ["...", ...]}
+    - GET  /metrics  latency, batching and backpressure counters
+    - GET  /health
+
+    Reviews from concurrent requests are coalesced into micro-batches
+    of at most max_batch_size reviews, waiting at most max_wait_ms for
+    a batch to fill. At most max_queue reviews may wait for inference;
+    beyond that requests are rejected with HTTP 503.
+
+    model_name, tokenizer_name, quantize and backend select the model
+    the same way as in SentimentPipeline.
+    """
+
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 8000,
+                 max_batch_size: int = 32,
+                 max_wait_ms: float = 10.0,
+                 max_queue: int = 1024,
+                 max_request_size: int = 64,
+                 max_len: int = 64,
+                 latency_window: int = 10_000,
+                 model_name: str = None,
+                 tokenizer_name: str = None,
+                 quantize: bool = False,
+                 backend: str = "torch"):
+        self.host = host
+        self.port = port
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_queue = max_queue
+        self.max_request_size = max_request_size
+
+        self.cleaner = TextCleaner()
+        encoder_kwargs = {"model_name": tokenizer_name} if tokenizer_name else {}
+        self.encoder = BertTextEncoder(max_len=max_len, use_fast=True, **encoder_kwargs)
+        classifier_kwargs = {"model_name": model_name} if model_name else {}
+        self.classifier = SentimentClassifier(quantize=quantize, backend=backend,
+                                              **classifier_kwargs)
+        self.formatter = ResultFormatter()
+
+        self.latencies_ms = deque(maxlen=latency_window)
+        self.counters = {"requests": 0, "reviews": 0, "batches": 0,
+                         "rejected": 0, "errors": 0}
+        self._queue = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    # ---------------- Inference ----------------
+    def warmup(self) -> None:
+        """
+        Load the tokenizer and model before accepting requests.
+        """
+        self.encoder.warmup()
+        self.classifier.warmup()
+
+    def predict_batch(self, reviews) -> list:
+        """
+        Synchronously classify a list of raw reviews with a single
+        forward pass and return their final_sentiment strings.
+        """
+        texts = [self.cleaner.clean(review) for review in reviews]
+        encoding = self.encoder.encode_ragged(texts)
+        labels, probabilities = self.classifier.classify_batch(
+            encoding.rows(), encoding.attention_rows()
+        )
+        return self.formatter.final_predictions(labels, probabilities)
+
+    async def predict(self, reviews) -> list:
+        """
+        Queue reviews for micro-batched inference and wait for their
+        final_sentiment strings.
+
+        Raises:
+            ServiceOverloaded: if the queue cannot take all reviews.
+        """
+        if self._queue.qsize() + len(reviews) > self.max_queue:
+            self.counters["rejected"] += 1
+            raise ServiceOverloaded(f"queue is full ({self.max_queue} reviews)")
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for review in reviews:
+            future = loop.create_future()
+            self._queue.put_nowait((review, future))
+            futures.append(future)
+        return list(await asyncio.gather(*futures))
+
+    async def _batch_worker(self) -> None:
+        """
+        Collect queued reviews into micro-batches and run each batch
+        in the inference thread.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            reviews = [review for review, _ in batch]
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, self.predict_batch, reviews
+                )
+            except Exception as exc:
+                self.counters["errors"] += 1
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            self.counters["batches"] += 1
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def metrics(self) -> dict:
+        """
+        Return request counters, average batch size, queue depth and
+        per-request latency percentiles (in milliseconds).
+        """
+        metrics = dict(self.counters)
+        metrics["queue_depth"] = self._queue.qsize() if self._queue else 0
+        metrics["avg_batch_size"] = (
+            round(self.counters["reviews"] / self.counters["batches"], 2)
+            if self.counters["batches"] else 0.0
+        )
+        if self.latencies_ms:
+            latencies = np.fromiter(self.latencies_ms, dtype=np.float64)
+            for pct in (50, 95, 99):
+                metrics[f"latency_p{pct}_ms"] = round(float(np.percentile(latencies, pct)), 2)
+            metrics["latency_max_ms"] = round(float(latencies.max()), 2)
+        return metrics
+
+    # ---------------- HTTP ----------------
+    async def _handle_predict(self, body: bytes):
+        """
+        Handle a POST /predict body, returning (status, payload).
+        """
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            return 400, {"error": "body must be JSON"}
+        if not isinstance(payload, dict):
+            return 400, {"error": "body must be a JSON object"}
+
+        if isinstance(payload.get("review"), str):
+            reviews, single = [payload["review"]], True
+        elif (isinstance(payload.get("reviews"), list)
+              and all(isinstance(review, str) for review in payload["reviews"])):
+            reviews, single = payload["reviews"], False
+        else:
+            return 400, {"error": "expected {'review': str} or {'reviews': [str, ...]}"}
+
+        if len(reviews) > self.max_request_size:
+            return 413, {"error": f"at most {self.max_request_size} reviews per request"}
+
+        try:
+            results = await self.predict(reviews)
+        except ServiceOverloaded as exc:
+            return 503, {"error": str(exc)}
+
+        self.counters["requests"] += 1
+        self.counters["reviews"] += len(reviews)
+        if single:
+            return 200, {"final_sentiment": results[0]}
+        return 200, {"final_sentiment": results}
+
+    async def _handle_connection(self, reader, writer) -> None:
+        """
+        Serve a single HTTP request and close the connection.
+        """
+        started = time.perf_counter()
+        status, payload = 500, {"error": "internal error"}
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            try:
+                content_length = int(headers.get("content-length", 0))
+            except ValueError:
+                content_length = -1
+            if content_length < 0:
+                status, payload = 400, {"error": "invalid Content-Length"}
+                return
+            body = await reader.readexactly(content_length)
+
+            method, path = (request_line + ["", ""])[:2]
+            if method == "POST" and path == "/predict":
+                status, payload = await self._handle_predict(body)
+                if status == 200:
+                    self.latencies_ms.append((time.perf_counter() - started) * 1000)
+            elif method == "GET" and path == "/metrics":
+                status, payload = 200, self.metrics()
+            elif method == "GET" and path == "/health":
+                status, payload = 200, {"status": "ok"}
+            else:
+                status, payload = 404, {"error": "not found"}
+        except Exception as exc:
+            status, payload = 500, {"error": str(exc)}
+        finally:
+            data = json.dumps(payload).encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                "Connection: close\r\n\r\n".encode("latin-1") + data
+            )
+            try:
+                await writer.drain()
+            finally:
+                writer.close()
+
+    async def serve(self) -> None:
+        """
+        Start the batch worker and the HTTP server and serve forever.
+        """
+        self._queue = asyncio.Queue()
+        self.warmup()
+        worker = asyncio.create_task(self._batch_worker())
+        server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        print(f"\nSentiment service listening on http://{self.host}:{self.port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            worker.cancel()
+            self._executor.shutdown(wait=False)
+
+    def run(self) -> None:
+        """
+        Blocking entry point: serve until interrupted.
+        """
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            print("\nSentiment service stopped.")
@@ -0,0 +1,184 @@
+"""
+Step 6 (sharded): BERT inference spread over several worker processes.
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .classifier import SentimentClassifier
+from .stage_metrics import peak_rss_mb
+
+# State of each worker process; _init_worker() sets its "classifier".
+_WORKER = {}
+
+
+def _init_worker(classifier, classifier_kwargs: dict, threads_per_worker: int) -> None:
+    """
+    Pin the worker's torch thread count and install its classifier:
+    the parent's (forked, weights shared copy-on-write) when given,
+    otherwise a freshly loaded one.
+    """
+    import torch
+
+    torch.set_num_threads(threads_per_worker)
+    if classifier is None:
+        classifier = SentimentClassifier(**classifier_kwargs)
+        classifier.load()
+    _WORKER["classifier"] = classifier
+
+
+def _classify_shard(shard_no: int, input_ids, attention_mask, batch_size: int,
+                    return_embeddings: bool = False):
+    """
+    Classify one shard in a worker, timing it and counting the batch
+    sizes it used, and report the worker's peak RSS.
+    """
+    classifier = _WORKER["classifier"]
+    classifier.batch_sizes.clear()
+    start = time.perf_counter()
+    outputs = SentimentClassifier.classify_bucketed(
+        classifier, input_ids, attention_mask, batch_size,
+        return_embeddings=return_embeddings,
+    )
+    elapsed = time.perf_counter() - start
+    tokens = int(sum(np.sum(mask) for mask in attention_mask))
+    labels, probabilities = outputs[:2]
+    embeddings = outputs[2] if return_embeddings else None
+    return (shard_no, os.getpid(), labels, probabilities, elapsed, tokens,
+            classifier.batch_sizes.copy(), embeddings, peak_rss_mb())
+
+
+class ShardedClassifier(SentimentClassifier):
+    """
+    A SentimentClassifier that splits the encoded rows into shards and
+    classifies them in n_workers processes, each with its own model
+    copy and torch pinned to threads_per_worker threads.
+
+    Where the OS supports fork, the model is loaded once in the parent
+    and the workers inherit its weights read-only (copy-on-write), so
+    the weights are not duplicated in memory. Elsewhere (and with the
+    ONNX backend) every worker loads its own copy, from the ONNX export
+    or INT8 cache the parent prepared before starting them.
+
+    Results are merged back in the original row order, and per-worker
+    throughput (and peak RSS) of the last call is kept in
+    self.worker_stats. Batch
+    sizes and token counts from all workers are added to
+    self.batch_sizes and self.tokens_classified.
+
+    The worker pool is started on first use or through warmup().
+    """
+
+    def __init__(self, n_workers: int = None, threads_per_worker: int = 1,
+                 shards_per_worker: int = 4, **classifier_kwargs):
+        super().__init__(**classifier_kwargs)
+        self.n_workers = n_workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+        self.threads_per_worker = threads_per_worker
+        self.shards_per_worker = shards_per_worker
+        self.batch_size = self.batch_size or 32
+        self.worker_stats = None
+        self.classifier_kwargs = classifier_kwargs
+        self.pool = None
+
+    def _start_pool(self) -> None:
+        """
+        Start the worker pool, loading the model in the parent first
+        when the workers are forked from it.
+        """
+        # ONNX Runtime sessions are not fork-safe, so that backend
+        # always loads the model in freshly spawned workers. Those only
+        # load cached files, which the parent creates up front, so the
+        # workers never export or quantize the model concurrently.
+        methods = multiprocessing.get_all_start_methods()
+        if "fork" in methods and self.backend_name == "torch":
+            self.load()
+            context, shared = multiprocessing.get_context("fork"), self
+        else:
+            self.prepare()
+            context, shared = multiprocessing.get_context("spawn"), None
+
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(shared, self.classifier_kwargs, self.threads_per_worker),
+        )
+        # Start every worker up front, so spawned workers have loaded
+        # their model before the first shard is timed.
+        list(self.pool.map(int, range(self.n_workers)))
+
+    def warmup(self) -> None:
+        """
+        Start the worker pool so every worker has its model loaded.
+        """
+        if self.pool is None:
+            self._start_pool()
+
+    def classify_bucketed(self, input_ids, attention_mask, batch_size: int,
+                          return_embeddings: bool = False):
+        """
+        Classify all rows across the worker pool. Rows are split into
+        contiguous shards, each worker length-buckets its own shards,
+        and the results (and embeddings, with return_embeddings) are
+        concatenated back in the original order.
+        """
+        if self.pool is None:
+            self._start_pool()
+        input_ids = list(input_ids)
+        attention_mask = list(attention_mask)
+        n_shards = min(len(input_ids), self.n_workers * self.shards_per_worker)
+        if n_shards == 0:
+            empty = np.empty((0, 2), dtype=np.float32)
+            return ([], empty, None) if return_embeddings else ([], empty)
+        bounds = np.linspace(0, len(input_ids), n_shards + 1).astype(int)
+
+        start = time.perf_counter()
+        futures = [
+            self.pool.submit(_classify_shard, shard_no,
+                             input_ids[lo:hi], attention_mask[lo:hi], batch_size,
+                             return_embeddings)
+            for shard_no, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:]))
+        ]
+        results = sorted((future.result() for future in futures), key=lambda r: r[0])
+        wall_time = time.perf_counter() - start
+
+        labels, per_worker = [], {}
+        for _, pid, shard_labels, _, elapsed, tokens, batch_sizes, _, peak in results:
+            labels.extend(shard_labels)
+            self.batch_sizes.update(batch_sizes)
+            self.tokens_classified += tokens
+            stats = per_worker.setdefault(pid, {"rows": 0, "tokens": 0, "busy_seconds": 0.0})
+            stats["rows"] += len(shard_labels)
+            stats["tokens"] += tokens
+            stats["busy_seconds"] += elapsed
+            stats["peak_rss_mb"] = peak
+
+        for stats in per_worker.values():
+            stats["rows_per_sec"] = round(stats["rows"] / stats["busy_seconds"], 2)
+            stats["busy_seconds"] = round(stats["busy_seconds"], 4)
+
+        self.worker_stats = {
+            "n_workers": self.n_workers,
+            "threads_per_worker": self.threads_per_worker,
+            "rows": len(labels),
+            "wall_seconds": round(wall_time, 4),
+            "rows_per_sec": round(len(labels) / wall_time, 2),
+            "workers": per_worker,
+        }
+        print(f"\nSharded inference: {self.worker_stats}")
+        probabilities = np.concatenate([result[3] for result in results])
+        if return_embeddings:
+            return labels, probabilities, np.concatenate([result[7] for result in results])
+        return labels, probabilities
+
+    def close(self) -> None:
+        """
+        Shut down the worker pool.
+        """
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
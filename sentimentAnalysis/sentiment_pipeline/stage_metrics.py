@@ -0,0 +1,166 @@
+"""
+Per-stage wall time, throughput and memory instrumentation.
+"""
+
+import json
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def peak_rss_mb() -> float:
+    """
+    Return the peak resident set size of this process so far, in MB,
+    or None where the platform does not report it.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / scale, 1)
+
+
+def _reset_peak_rss() -> bool:
+    """
+    Reset the kernel's peak RSS (VmHWM) of this process to its current
+    RSS. Returns False where that is not supported.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="utf-8") as fh:
+            fh.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _vm_hwm_mb() -> float:
+    """
+    Peak RSS of this process since its last reset, in MB, or None.
+    """
+    try:
+        with open("/proc/self/status", encoding="utf-8") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+class StageMetrics:
+    """
+    Records wall time, rows/sec and peak RSS for every pipeline stage
+    run inside stage(). A stage may also report the number of tokens
+    it processed and a histogram of the batch sizes it used, in which
+    case tokens/sec is recorded as well.
+
+    peak_rss_mb is the running peak of the whole process. With
+    reset_peak (Linux only) the process's peak RSS is reset when each
+    stage starts, so peak_rss_mb is the peak of that stage alone; this
+    writes to /proc/self/clear_refs, which also resets the peak for any
+    other code measuring it, so it is off by default. peak_rss_scope
+    ('stage' or 'process') says which applies.
+
+    workers_peak_rss_mb adds up the peak RSS that the stage's own
+    worker processes (sharded inference, cleaning pool) reported with
+    their results, passed in as record["worker_peaks"] ({pid: MB}), or
+    is None without workers. No other process is inspected.
+
+    Every record is kept in self.records and, when jsonl_file is
+    given, appended to it as one JSON line. report() aggregates the
+    records per stage name, e.g. across the chunks of a streaming run.
+    """
+
+    def __init__(self, jsonl_file: str = None, reset_peak: bool = False):
+        self.jsonl_file = jsonl_file
+        self.reset_peak = reset_peak
+        self.records = []
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None):
+        """
+        Time the enclosed block as one run of stage name.
+
+        Yields the record dict, so the block can fill in 'rows' when
+        it is only known afterwards, 'tokens' / 'batch_sizes', and
+        'worker_peaks' (summed into workers_peak_rss_mb).
+        """
+        record = {"stage": name, "rows": rows}
+        per_stage = self.reset_peak and _reset_peak_rss()
+        start = time.perf_counter()
+        yield record
+        seconds = time.perf_counter() - start
+        worker_peaks = [peak for peak in (record.pop("worker_peaks", None) or {}).values()
+                        if peak is not None]
+
+        record["seconds"] = round(seconds, 4)
+        record["rows_per_sec"] = round(record["rows"] / seconds, 2) if seconds else None
+        if "tokens" in record:
+            record["tokens_per_sec"] = round(record["tokens"] / seconds, 2) if seconds else None
+        if "batch_sizes" in record:
+            record["batch_sizes"] = dict(sorted(record["batch_sizes"].items()))
+        if per_stage:
+            record["peak_rss_mb"] = _vm_hwm_mb()
+            record["peak_rss_scope"] = "stage"
+        else:
+            record["peak_rss_mb"] = peak_rss_mb()
+            record["peak_rss_scope"] = "process"
+        record["workers_peak_rss_mb"] = round(sum(worker_peaks), 1) if worker_peaks else None
+        self.records.append(record)
+
+        if self.jsonl_file:
+            with open(self.jsonl_file, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(record) + "\n")
+
+    def report(self) -> dict:
+        """
+        Return the metrics aggregated per stage, in the order the
+        stages first ran, plus the total time and the peak RSS of the
+        whole process. A stage's peak RSS is the largest over its runs.
+        """
+        stages = {}
+        for record in self.records:
+            stage = stages.setdefault(record["stage"], {"runs": 0, "rows": 0, "seconds": 0.0})
+            stage["runs"] += 1
+            stage["rows"] += record["rows"]
+            stage["seconds"] += record["seconds"]
+            if "tokens" in record:
+                stage["tokens"] = stage.get("tokens", 0) + record["tokens"]
+            if "batch_sizes" in record:
+                stage.setdefault("batch_sizes", Counter()).update(record["batch_sizes"])
+            for field in ("peak_rss_mb", "workers_peak_rss_mb"):
+                if record[field] is not None:
+                    stage[field] = max(stage.get(field) or 0, record[field])
+                else:
+                    stage.setdefault(field, None)
+            stage["peak_rss_scope"] = record["peak_rss_scope"]
+
+        for stage in stages.values():
+            seconds = stage["seconds"]
+            stage["rows_per_sec"] = round(stage["rows"] / seconds, 2) if seconds else None
+            if "tokens" in stage:
+                stage["tokens_per_sec"] = round(stage["tokens"] / seconds, 2) if seconds else None
+            if "batch_sizes" in stage:
+                stage["batch_sizes"] = dict(sorted(stage["batch_sizes"].items()))
+            stage["seconds"] = round(seconds, 4)
+            for field in ("peak_rss_mb", "workers_peak_rss_mb", "peak_rss_scope"):
+                stage[field] = stage.pop(field)
+
+        return {
+            "stages": stages,
+            "total_seconds": round(sum(record["seconds"] for record in self.records), 4),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+    def reset(self) -> None:
+        """
+        Forget all recorded stages.
+        """
+        self.records = []
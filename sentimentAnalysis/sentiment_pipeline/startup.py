@@ -0,0 +1,30 @@
+"""
+Startup-time accounting for lazy imports and deferred model loading.
+"""
+
+import time
+from contextlib import contextmanager
+
+# Accumulated seconds per startup step, in the order first recorded.
+STARTUP_TIMES = {}
+
+
+@contextmanager
+def record_startup(step: str):
+    """
+    Time the enclosed block and add it to STARTUP_TIMES[step].
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMES[step] = STARTUP_TIMES.get(step, 0.0) + time.perf_counter() - start
+
+
+def startup_report() -> dict:
+    """
+    Return the recorded startup steps (in seconds) plus their total.
+    """
+    report = {step: round(seconds, 4) for step, seconds in STARTUP_TIMES.items()}
+    report["total"] = round(sum(STARTUP_TIMES.values()), 4)
+    return report
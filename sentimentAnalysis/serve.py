@@ -0,0 +1,39 @@
+"""
+Entry point for running the sentiment analysis HTTP service.
+
+Usage:
+    python serve.py [--host 127.0.0.1] [--port 8000] [--model NAME] [--quantize]
+"""
+
+import argparse
+
+from sentiment_pipeline.service import SentimentService
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    parser.add_argument("--max-queue", type=int, default=1024)
+    parser.add_argument("--max-len", type=int, default=64)
+    parser.add_argument("--model", help="classifier model name or directory")
+    parser.add_argument("--tokenizer", help="tokenizer name or directory")
+    parser.add_argument("--quantize", action="store_true", help="INT8 dynamic quantization")
+    parser.add_argument("--backend", default="torch", choices=["torch", "onnx"])
+    args = parser.parse_args()
+
+    service = SentimentService(
+        host=args.host,
+        port=args.port,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        max_queue=args.max_queue,
+        max_len=args.max_len,
+        model_name=args.model,
+        tokenizer_name=args.tokenizer,
+        quantize=args.quantize,
+        backend=args.backend,
+    )
+    service.run()
@@ -14,9 +14,22 @@ Dataset: news_dataset.csv
 # ================================
 # 📦 Imports
 # ================================
+import argparse
+import contextlib
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import shutil
 import string
 import subprocess
 import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 
 # NLP libraries
@@ -29,39 +42,112 @@ from nltk.stem import PorterStemmer
 
 # ML libraries
 from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import classification_report, accuracy_score
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.metrics import classification_report, accuracy_score, confusion_matrix
+from sklearn.preprocessing import normalize
 
 
 # ================================
-# 🔽 Download required resources
+# 🔽 Load NLP resources
 # ================================
-nltk.download('punkt')
-nltk.download('stopwords')
 
-# Load spaCy model
+# Pipeline components lemmas don't need. The lemmatizer relies on the
+# tagger and attribute ruler for POS, and is_stop / is_punct are
+# lexical attributes, so the parser and NER can be skipped entirely.
+SPACY_DISABLED_COMPONENTS = ["parser", "ner"]
+
 
-def load_spacy_model():
+def load_spacy_model(disable=None):
     """Load the spaCy English model, installing it if missing.
 
+    Args:
+        disable (list): Pipeline components not to run. Defaults to
+            SPACY_DISABLED_COMPONENTS.
+
     Returns:
         spacy.language.Language: Loaded spaCy language model.
     """
+    if disable is None:
+        disable = SPACY_DISABLED_COMPONENTS
     try:
-        return spacy.load("en_core_web_sm")
+        return spacy.load("en_core_web_sm", disable=disable)
     except OSError:
         print("⚠️ spaCy model not found. Installing...")
         subprocess.check_call([sys.executable, "-m", "spacy", "download", "en_core_web_sm"])
-        return spacy.load("en_core_web_sm")
+        return spacy.load("en_core_web_sm", disable=disable)
+
+
+# Shared tools of this process ("nlp", "stop_words", "stemmer"),
+# filled in by load_resources()
+_resources = {}
+
+
+def load_resources(download: bool = True):
+    """
+    Load the NLP tools used by the preprocessing functions:
+    - NLTK punkt and stopwords data (downloaded if download is set)
+    - English stopword set and Porter stemmer
+    - spaCy model
+    Does nothing if this process has already loaded them.
+    """
+    if _resources:
+        return
+
+    if download:
+        nltk.download('punkt')
+        nltk.download('stopwords')
+
+    _resources.update(
+        nlp=load_spacy_model(),
+        stop_words=set(stopwords.words('english')),
+        stemmer=PorterStemmer(),
+    )
+
+
+# Parallel preprocessing (PREPROCESS_WORKERS <= 1 runs it serially)
+PREPROCESS_WORKERS = os.cpu_count() or 1
+PREPROCESS_CHUNK_SIZE = 2000
+
+# Experiment grid jobs run in parallel (EXPERIMENT_WORKERS <= 1 runs them serially)
+EXPERIMENT_WORKERS = os.cpu_count() or 1
 
-nlp = load_spacy_model()
+# Stems and lemmas memoized across runs
+TOKEN_CACHE_FILE = "token_cache.pkl"
 
+# Preprocessed columns cached across runs
+PREPROCESS_CACHE_DIR = "preprocess_cache"
 
-# Initialize tools
-stop_words = set(stopwords.words('english'))
-stemmer = PorterStemmer()
+# Bump a preprocessor's tag whenever a code change alters its output
+PREPROCESSOR_VERSIONS = {
+    "text_tokenized": "tokenize-1",
+    "text_stemmed": "stem-1",
+    "text_lemmatized": "lemmatize-2",
+}
+
+
+# Preprocessing variant compared in the results -> its column
+TEXT_VARIANTS = {
+    "Tokenized": "text_tokenized",
+    "Stemmed": "text_stemmed",
+    "Lemmatized": "text_lemmatized",
+}
+
+
+def preprocessor_versions() -> dict:
+    """Full version tag of each preprocessed column, library versions included."""
+    nltk_tag = f"nltk-{nltk.__version__}"
+    spacy_tag = (
+        f"spacy-{spacy.__version__}"
+        f"|en_core_web_sm-{spacy.util.get_package_version('en_core_web_sm')}"
+        f"|disabled-{','.join(sorted(SPACY_DISABLED_COMPONENTS))}"
+    )
+    return {
+        "text_tokenized": f"{PREPROCESSOR_VERSIONS['text_tokenized']}|{nltk_tag}",
+        "text_stemmed": f"{PREPROCESSOR_VERSIONS['text_stemmed']}|{nltk_tag}",
+        "text_lemmatized": f"{PREPROCESSOR_VERSIONS['text_lemmatized']}|{spacy_tag}",
+    }
 
 
 # ================================
@@ -94,16 +180,51 @@ def explore_data(df: pd.DataFrame):
 # 🧠 Preprocessing Functions
 # ================================
 
+# Every token the punctuation filter drops. The filter has always been
+# `t not in string.punctuation`, a substring test that also drops
+# multi-character tokens like "()", so the set holds every substring.
+punctuation_tokens = frozenset(
+    string.punctuation[i:j]
+    for i in range(len(string.punctuation))
+    for j in range(i, len(string.punctuation) + 1)
+)
+
+
+def _tokenized(tokens: list) -> str:
+    """Join the lowercased tokens that are neither punctuation nor stopwords."""
+    stop_words = _resources["stop_words"]
+    return " ".join([
+        t for t in tokens
+        if t not in punctuation_tokens and t not in stop_words
+    ])
+
+
+def _stemmed(tokens: list, token_cache=None) -> str:
+    """Join the stems of the alphabetic, non-stopword tokens."""
+    stop_words = _resources["stop_words"]
+    stem = token_cache.stem if token_cache is not None else _resources["stemmer"].stem
+    return " ".join([
+        stem(t) for t in tokens
+        if t.isalpha() and t not in stop_words
+    ])
+
+
+def _lemmatized(doc) -> str:
+    """Join the lemmas of a spaCy Doc, skipping stopwords and punctuation."""
+    return " ".join([
+        token.lemma_
+        for token in doc
+        if not token.is_stop and not token.is_punct
+    ])
+
+
 def tokenize_text(text: str) -> str:
     """
     Tokenization:
     - Lowercase
     - Remove punctuation and stopwords
     """
-    tokens = word_tokenize(text.lower())
-    tokens = [t for t in tokens if t not in string.punctuation]
-    tokens = [t for t in tokens if t not in stop_words]
-    return " ".join(tokens)
+    return _tokenized(word_tokenize(text.lower()))
 
 
 def stem_text(text: str) -> str:
@@ -112,10 +233,7 @@ def stem_text(text: str) -> str:
     - Apply Porter Stemmer
     - Remove non-alphabetic tokens
     """
-    tokens = word_tokenize(text.lower())
-    tokens = [t for t in tokens if t.isalpha()]
-    tokens = [stemmer.stem(t) for t in tokens if t not in stop_words]
-    return " ".join(tokens)
+    return _stemmed(word_tokenize(text.lower()))
 
 
 def lemmatize_text(text: str) -> str:
@@ -124,84 +242,921 @@ def lemmatize_text(text: str) -> str:
     - Using spaCy
     - Remove stopwords and punctuation
     """
-    doc = nlp(text)
-    return " ".join([
-        token.lemma_
-        for token in doc
-        if not token.is_stop and not token.is_punct
-    ])
+    return _lemmatized(_resources["nlp"](text))
+
+
+def lemmatize_texts(texts, batch_size: int = 1000, n_process: int = 1,
+                    token_cache=None) -> list:
+    """
+    Bulk lemmatization:
+    - Streams the texts through spaCy with nlp.pipe, in batches
+    - Optionally across n_process worker processes
+    - With a token_cache, the lemmatizer component is skipped and each
+      distinct (token, POS, morphology) is lemmatized once through the cache
+    - Same output as lemmatize_text on each text
+    """
+    nlp = _resources["nlp"]
+    if token_cache is None:
+        return [
+            _lemmatized(doc)
+            for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+        ]
+
+    lemmatizer = nlp.get_pipe("lemmatizer")
+    lemma = token_cache.lemma
+    with nlp.select_pipes(disable="lemmatizer"):
+        return [
+            " ".join([
+                lemma(token, lemmatizer)
+                for token in doc
+                if not token.is_stop and not token.is_punct
+            ])
+            for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+        ]
+
+
+def preprocess_column(texts: list, column: str, batch_size: int = 1000,
+                      token_cache=None) -> list:
+    """
+    Compute a single preprocessed column for texts:
+    - 'text_tokenized', 'text_stemmed' or 'text_lemmatized'
+    - Same values as preprocess_dataset, without the other two columns
+    """
+    load_resources()
+    if column == "text_tokenized":
+        return [tokenize_text(text) for text in texts]
+    if column == "text_stemmed":
+        return [_stemmed(word_tokenize(text.lower()), token_cache) for text in texts]
+    if column == "text_lemmatized":
+        return lemmatize_texts(texts, batch_size=batch_size, token_cache=token_cache)
+    raise ValueError(f"Unknown preprocessed column: {column}")
+
+
+def _token_variants(text: str, token_cache=None) -> tuple:
+    """Tokenize once and build the tokenized and stemmed variants."""
+    tokens = word_tokenize(text.lower())
+    return _tokenized(tokens), _stemmed(tokens, token_cache)
+
+
+# ================================
+# 🗃️ Token Cache
+# ================================
+class TokenCache:
+    """
+    Bounded memo of per-token preprocessing results:
+    - stem:  surface token -> Porter stem
+    - lemma: (token text, POS, morphology) -> spaCy lemma; the rule
+      lemmatizer's exceptions and rules depend on all three
+    Each table keeps at most max_size entries and evicts the least
+    recently used one beyond that. Results are exactly those of the
+    uncached path; only repeated work is skipped.
+    """
+
+    def __init__(self, max_size: int = 500_000):
+        self.max_size = max_size
+        self.stems = OrderedDict()
+        self.lemmas = OrderedDict()
+        self.hits = {"stem": 0, "lemma": 0}
+        self.misses = {"stem": 0, "lemma": 0}
+        # When set to a list, every new entry is also logged to it
+        self.journal = None
+
+    def stem(self, token: str) -> str:
+        """Porter stem of token, computed once per distinct token."""
+        stems = self.stems
+        if token in stems:
+            self.hits["stem"] += 1
+            stems.move_to_end(token)
+            return stems[token]
+
+        self.misses["stem"] += 1
+        value = stems[token] = _resources["stemmer"].stem(token)
+        if len(stems) > self.max_size:
+            stems.popitem(last=False)
+        if self.journal is not None:
+            self.journal.append(("stem", token, value))
+        return value
+
+    def lemma(self, token, lemmatizer) -> str:
+        """
+        Lemma of a spaCy token from a pipeline run without its
+        lemmatizer, computed once per distinct (text, POS, morphology).
+        """
+        # Lemmas set by the attribute ruler win, as in the lemmatizer.
+        if token.lemma != 0:
+            return token.lemma_
+
+        key = (token.orth_, token.pos_, str(token.morph))
+        lemmas = self.lemmas
+        if key in lemmas:
+            self.hits["lemma"] += 1
+            lemmas.move_to_end(key)
+            return lemmas[key]
+
+        self.misses["lemma"] += 1
+        value = lemmas[key] = lemmatizer.lemmatize(token)[0]
+        if len(lemmas) > self.max_size:
+            lemmas.popitem(last=False)
+        if self.journal is not None:
+            self.journal.append(("lemma", key, value))
+        return value
+
+    def merge(self, entries: list, hits: dict, misses: dict):
+        """Add entries and counts logged by another copy of the cache."""
+        tables = {"stem": self.stems, "lemma": self.lemmas}
+        for name, key, value in entries:
+            table = tables[name]
+            table[key] = value
+            table.move_to_end(key)
+            if len(table) > self.max_size:
+                table.popitem(last=False)
+        for name in self.hits:
+            self.hits[name] += hits[name]
+            self.misses[name] += misses[name]
+
+    def stats(self) -> dict:
+        """Hits, misses, hit rate and size of each table."""
+        sizes = {"stem": len(self.stems), "lemma": len(self.lemmas)}
+        stats = {}
+        for name, size in sizes.items():
+            lookups = self.hits[name] + self.misses[name]
+            stats[name] = {
+                "hits": self.hits[name],
+                "misses": self.misses[name],
+                "hit_rate": self.hits[name] / lookups if lookups else 0.0,
+                "size": size,
+            }
+        return stats
+
+    @staticmethod
+    def signature() -> dict:
+        """Versions the cached results depend on."""
+        nlp = _resources["nlp"]
+        return {
+            "nltk": nltk.__version__,
+            "spacy": spacy.__version__,
+            "model": f"{nlp.meta.get('name')}-{nlp.meta.get('version')}",
+            "disabled": sorted(SPACY_DISABLED_COMPONENTS),
+            "lemma_key": "orth|pos|morph",
+        }
+
+    def save(self, path: str):
+        """Persist the cache with pickle, tagged with signature()."""
+        with open(path, "wb") as fh:
+            pickle.dump({
+                "signature": self.signature(),
+                "stems": dict(self.stems),
+                "lemmas": dict(self.lemmas),
+            }, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str, max_size: int = 500_000) -> "TokenCache":
+        """
+        Load a cache written by save(). A missing file, or one written
+        with different library or model versions, gives an empty cache.
+        """
+        cache = cls(max_size=max_size)
+        if not os.path.exists(path):
+            return cache
+
+        with open(path, "rb") as fh:
+            saved = pickle.load(fh)
+        if saved.get("signature") != cls.signature():
+            print("⚠️ Token cache was built with other NLTK/spaCy versions, ignoring it")
+            return cache
+
+        # Keep the most recently used entries if max_size shrank.
+        cache.stems.update(list(saved["stems"].items())[-max_size:])
+        cache.lemmas.update(list(saved["lemmas"].items())[-max_size:])
+        return cache
+
+
+def print_cache_stats(token_cache: TokenCache):
+    """Display the token cache hit rates."""
+    print("\n🗃️ Token cache")
+    for name, stats in token_cache.stats().items():
+        print(f"{name:6} | hit rate: {stats['hit_rate']:.1%} | "
+              f"hits: {stats['hits']} | misses: {stats['misses']} | size: {stats['size']}")
 
 
 # ================================
 # 🔄 Apply Preprocessing
 # ================================
-def preprocess_dataset(df: pd.DataFrame) -> pd.DataFrame:
-    """Apply all preprocessing techniques."""
+def _preprocess_texts(texts: list, batch_size: int = 1000, n_process: int = 1,
+                      token_cache: TokenCache = None) -> tuple:
+    """Return the (tokenized, stemmed, lemmatized) lists for texts."""
+    variants = [_token_variants(text, token_cache) for text in texts]
+    tokenized, stemmed = zip(*variants) if variants else ((), ())
+    lemmatized = lemmatize_texts(texts, batch_size=batch_size,
+                                 n_process=n_process, token_cache=token_cache)
+    return list(tokenized), list(stemmed), lemmatized
+
+
+# State of a preprocessing worker process ("token_cache")
+_worker_state = {}
+
+
+def _init_preprocess_worker(token_cache: TokenCache):
+    """Pool initializer: load the NLP tools once per worker process."""
+    load_resources(download=False)
+    _worker_state["token_cache"] = token_cache
+
+
+def _preprocess_chunk(texts: list, batch_size: int) -> tuple:
+    """
+    Pool task: preprocess one chunk of texts.
+
+    Returns:
+        tuple: (tokenized, stemmed, lemmatized) lists, the CPU seconds
+        spent, and the new token cache entries, hits and misses of
+        this chunk (None without a cache).
+    """
+    start = time.process_time()
+    cache = _worker_state["token_cache"]
+    if cache is not None:
+        cache.journal = []
+        hits, misses = dict(cache.hits), dict(cache.misses)
+
+    columns = _preprocess_texts(texts, batch_size=batch_size, token_cache=cache)
+
+    cache_update = None
+    if cache is not None:
+        cache_update = (
+            cache.journal,
+            {name: cache.hits[name] - hits[name] for name in hits},
+            {name: cache.misses[name] - misses[name] for name in misses},
+        )
+        cache.journal = None
+    return columns, time.process_time() - start, cache_update
+
+
+def _preprocess_parallel(texts: list, n_workers: int, chunk_size: int,
+                         batch_size: int, token_cache: TokenCache) -> tuple:
+    """
+    Preprocess texts in chunks across a pool of n_workers processes
+    and reassemble the results in input order.
+
+    Every worker starts from its own copy of token_cache; the entries,
+    hits and misses of each chunk are merged back into token_cache.
+    """
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    tokenized, stemmed, lemmatized = [], [], []
+    busy_seconds = 0.0
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=n_workers,
+                             initializer=_init_preprocess_worker,
+                             initargs=(token_cache,)) as executor:
+        # map() yields results in chunk order
+        for columns, seconds, cache_update in executor.map(_preprocess_chunk, chunks,
+                                                           itertools.repeat(batch_size)):
+            tokenized += columns[0]
+            stemmed += columns[1]
+            lemmatized += columns[2]
+            busy_seconds += seconds
+            if cache_update is not None:
+                token_cache.merge(*cache_update)
+    wall_seconds = time.perf_counter() - start
+
+    # Summed task CPU time is what a single process would have spent.
+    speedup = busy_seconds / wall_seconds if wall_seconds else 0.0
+    print(f"⚡ {n_workers} workers, {len(chunks)} chunks of up to {chunk_size} texts: "
+          f"{wall_seconds:.2f}s wall vs {busy_seconds:.2f}s of CPU work "
+          f"({speedup:.1f}x speedup, pool startup included)")
+    return tokenized, stemmed, lemmatized
+
+
+def preprocess_dataset(df: pd.DataFrame, batch_size: int = 1000,
+                       n_process: int = 1, token_cache: TokenCache = None,
+                       n_workers: int = 1, chunk_size: int = 2000) -> pd.DataFrame:
+    """
+    Apply all preprocessing techniques:
+    - One NLTK tokenization per document for the tokenized and stemmed text
+    - One batched spaCy pass (batch_size docs per batch, n_process
+      processes) for the lemmatized text
+    - Stems and lemmas memoized per distinct token in token_cache, if given
+    - With n_workers > 1, chunks of chunk_size texts are preprocessed
+      in a pool of worker processes instead
+    """
     print("\n⚙️ Preprocessing texts...")
+    load_resources()
+
+    texts = df['text'].tolist()
+    if n_workers > 1 and len(texts) > chunk_size:
+        columns = _preprocess_parallel(texts, n_workers, chunk_size, batch_size, token_cache)
+    else:
+        columns = _preprocess_texts(texts, batch_size=batch_size, n_process=n_process,
+                                    token_cache=token_cache)
 
-    df['text_tokenized'] = df['text'].apply(tokenize_text)
-    df['text_stemmed'] = df['text'].apply(stem_text)
-    df['text_lemmatized'] = df['text'].apply(lemmatize_text)
+    df['text_tokenized'], df['text_stemmed'], df['text_lemmatized'] = columns
 
     print("✅ Preprocessing completed")
     return df
 
 
 # ================================
-# 🧮 Feature Extraction
+# 💾 Preprocessing Cache
 # ================================
-def vectorize_text(text_series):
-    """Convert text into TF-IDF features."""
-    vectorizer = TfidfVectorizer()
-    X = vectorizer.fit_transform(text_series)
-    return X, vectorizer
+class PreprocessCache:
+    """
+    Content-addressed on-disk cache of the preprocessed text columns,
+    stored as Parquet files under directory:
+    - files/<key>.parquet: every column of one input file, keyed by the
+      SHA-256 of the file contents and the preprocessor versions
+    - rows/<column>-<version>.parquet: the value of one column for every
+      distinct text seen so far, keyed by a hash of the text
+    A new preprocessor version starts fresh row stores for that column
+    only; the other columns stay cached.
+    """
+
+    COLUMNS = list(PREPROCESSOR_VERSIONS)
+
+    def __init__(self, directory: str = PREPROCESS_CACHE_DIR):
+        self.directory = directory
+        self.versions = preprocessor_versions()
+        os.makedirs(os.path.join(directory, "files"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "rows"), exist_ok=True)
+
+    @staticmethod
+    def file_hash(path: str) -> str:
+        """SHA-256 of a file's contents."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def text_hashes(texts) -> list:
+        """Row keys: a 128-bit BLAKE2b hash of each text."""
+        return [
+            hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+            for text in texts
+        ]
+
+    @staticmethod
+    def _digest(*parts: str) -> str:
+        """Short stable key for a sequence of strings."""
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:32]
+
+    def _file_path(self, file_hash: str) -> str:
+        key = self._digest(file_hash, *(self.versions[c] for c in self.COLUMNS))
+        return os.path.join(self.directory, "files", f"{key}.parquet")
+
+    def _rows_path(self, column: str) -> str:
+        key = self._digest(self.versions[column])
+        return os.path.join(self.directory, "rows", f"{column}-{key}.parquet")
+
+    @staticmethod
+    def _write(df: pd.DataFrame, path: str):
+        """Write df to path as Parquet, atomically."""
+        tmp_path = f"{path}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    def load_file(self, file_hash: str):
+        """Cached columns of an input file, or None."""
+        path = self._file_path(file_hash)
+        return pd.read_parquet(path) if os.path.exists(path) else None
+
+    def save_file(self, file_hash: str, columns: pd.DataFrame):
+        """Cache the preprocessed columns of an input file."""
+        self._write(columns[self.COLUMNS].reset_index(drop=True), self._file_path(file_hash))
+
+    def load_rows(self, column: str) -> dict:
+        """Cached values of column, keyed by text hash."""
+        path = self._rows_path(column)
+        if not os.path.exists(path):
+            return {}
+        rows = pd.read_parquet(path)
+        return dict(zip(rows['text_hash'], rows['value']))
+
+    def save_rows(self, column: str, rows: dict):
+        """Replace the cached values of column."""
+        self._write(
+            pd.DataFrame({"text_hash": list(rows), "value": list(rows.values())}),
+            self._rows_path(column),
+        )
+
+
+def preprocess_dataset_cached(df: pd.DataFrame, input_file: str, cache: PreprocessCache,
+                              token_cache_file: str = None, **kwargs) -> pd.DataFrame:
+    """
+    Preprocess df, as loaded from input_file, through cache:
+    - Unchanged input file: all columns are read back from the cache
+    - Otherwise only texts that are not cached yet are preprocessed
+      (with preprocess_dataset and kwargs), then the cache is updated
+    - token_cache_file: TokenCache used for those texts, if given
+    """
+    start = time.perf_counter()
+    file_hash = cache.file_hash(input_file)
+    cached = cache.load_file(file_hash)
+    if cached is not None and len(cached) == len(df):
+        for column in cache.COLUMNS:
+            df[column] = cached[column].to_numpy()
+        print(f"\n💾 Loaded preprocessed texts from cache in "
+              f"{(time.perf_counter() - start) * 1000:.0f} ms")
+        return df
+
+    hashes = cache.text_hashes(df['text'])
+    stores = {column: cache.load_rows(column) for column in cache.COLUMNS}
+    missing = [
+        i for i, text_hash in enumerate(hashes)
+        if any(text_hash not in stores[column] for column in cache.COLUMNS)
+    ]
+    print(f"\n💾 Preprocessing cache: reusing {len(df) - len(missing)} of {len(df)} rows")
+
+    if missing:
+        # Repeated texts only need preprocessing once
+        positions = list({hashes[i]: i for i in missing}.values())
+        new_rows = df.iloc[positions][['text']].copy()
+
+        token_cache = None
+        if token_cache_file:
+            load_resources()
+            token_cache = TokenCache.load(token_cache_file)
+        new_rows = preprocess_dataset(new_rows, token_cache=token_cache, **kwargs)
+        if token_cache is not None:
+            print_cache_stats(token_cache)
+            token_cache.save(token_cache_file)
+
+        new_hashes = [hashes[i] for i in positions]
+        for column in cache.COLUMNS:
+            stores[column].update(zip(new_hashes, new_rows[column]))
+            cache.save_rows(column, stores[column])
+
+    for column in cache.COLUMNS:
+        store = stores[column]
+        df[column] = [store[text_hash] for text_hash in hashes]
+    cache.save_file(file_hash, df)
+    return df
 
 
 # ================================
-# 🤖 Model Training & Evaluation
+# 🧪 Experiment Grid
 # ================================
-def evaluate_models(X, y, label: str):
+# Vectorizers and models compared, as (class, parameters)
+VECTORIZERS = {
+    'TF-IDF': (TfidfVectorizer, {}),
+}
+MODELS = {
+    'Naive Bayes': (MultinomialNB, {}),
+    'Logistic Regression': (LogisticRegression, {"max_iter": 1000}),
+}
+# Started first so that the quick jobs fill in around them
+SLOW_MODELS = {'Logistic Regression'}
+
+# Train/test matrices of a worker process, keyed by (variant, vectorizer)
+_experiment_data = {}
+
+
+def _init_experiment_worker(data: dict):
+    """Pool initializer: receive the shared matrices once per worker."""
+    _experiment_data.clear()
+    _experiment_data.update(data)
+
+
+def _run_experiment_job(data_key: tuple, model_name: str) -> dict:
     """
-    Train and evaluate:
-    - Naive Bayes
-    - Logistic Regression
+    Pool task: fit and score one model on one vectorized variant.
+
+    Returns:
+        dict: accuracy, classification report, fit and predict seconds.
     """
-    print(f"\n🚀 Evaluating for: {label}")
+    X_train, X_test, y_train, y_test = _experiment_data[data_key]
+    model_cls, params = MODELS[model_name]
+    model = model_cls(**params)
 
-    # Split dataset
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
-    )
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    predict_seconds = time.perf_counter() - start
+
+    return {
+        "accuracy": accuracy_score(y_test, y_pred),
+        "report": classification_report(y_test, y_pred),
+        "fit_seconds": fit_seconds,
+        "predict_seconds": predict_seconds,
+    }
+
+
+def run_experiments(df: pd.DataFrame, n_workers: int = 1, test_size: float = 0.2,
+                    random_state: int = 42) -> tuple:
+    """
+    Evaluate every (preprocessing variant, vectorizer, model) combination:
+    - Each variant is vectorized and split once, and its matrices are
+      shared by all models
+    - Every model fit is an independent job, run across a pool of
+      n_workers processes (never more than there are jobs)
+    - Reports are printed in grid order once all jobs are done
+
+    Returns:
+        tuple: results in the print_summary format, and one timing
+        record per job.
+    """
+    data = {}
+    for label, column in TEXT_VARIANTS.items():
+        for vectorizer_name, (vectorizer_cls, params) in VECTORIZERS.items():
+            X = vectorizer_cls(**params).fit_transform(df[column])
+            data[(label, vectorizer_name)] = train_test_split(
+                X, df['category'], test_size=test_size, random_state=random_state
+            )
+    jobs = [(data_key, model_name) for data_key in data for model_name in MODELS]
+    n_workers = min(n_workers, len(jobs))
+    print(f"\n🧪 Running {len(jobs)} experiment jobs on {n_workers} worker(s)...")
+
+    start = time.perf_counter()
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers,
+                                 initializer=_init_experiment_worker,
+                                 initargs=(data,)) as executor:
+            futures = {
+                job: executor.submit(_run_experiment_job, *job)
+                for job in sorted(jobs, key=lambda job: job[1] not in SLOW_MODELS)
+            }
+            outcomes = {job: future.result() for job, future in futures.items()}
+    else:
+        _init_experiment_worker(data)
+        outcomes = {job: _run_experiment_job(*job) for job in jobs}
+    wall_seconds = time.perf_counter() - start
 
     results = {}
+    timings = []
+    for job in jobs:
+        (label, vectorizer_name), model_name = job
+        outcome = outcomes[job]
+        variant = label if len(VECTORIZERS) == 1 else f"{label}/{vectorizer_name}"
 
-    # --------------------------
-    # ✅ Naive Bayes
-    # --------------------------
-    nb = MultinomialNB()
-    nb.fit(X_train, y_train)
-    y_pred_nb = nb.predict(X_test)
+        print(f"\n🧾 {variant} | {model_name} Report:")
+        print(outcome["report"])
 
-    print("\n🧾 Naive Bayes Report:")
-    print(classification_report(y_test, y_pred_nb))
+        results.setdefault(variant, {})[model_name] = outcome["accuracy"]
+        timings.append({
+            "variant": variant,
+            "model": model_name,
+            "fit_seconds": outcome["fit_seconds"],
+            "predict_seconds": outcome["predict_seconds"],
+        })
 
-    results['Naive Bayes'] = accuracy_score(y_test, y_pred_nb)
+    job_seconds = sum(t["fit_seconds"] + t["predict_seconds"] for t in timings)
+    print(f"⚡ {len(jobs)} jobs: {wall_seconds:.2f}s wall vs {job_seconds:.2f}s of job time")
+    return results, timings
 
-    # --------------------------
-    # ✅ Logistic Regression
-    # --------------------------
-    lr = LogisticRegression(max_iter=1000)
-    lr.fit(X_train, y_train)
-    y_pred_lr = lr.predict(X_test)
 
-    print("\n🧾 Logistic Regression Report:")
-    print(classification_report(y_test, y_pred_lr))
+# ================================
+# 🌊 Streaming Training
+# ================================
+class OnlineIdf:
+    """
+    IDF weighting learned incrementally from a stream of hashed
+    term-count matrices, with TfidfVectorizer's smooth idf and l2 norm.
+    """
+
+    def __init__(self, n_features: int):
+        self.n_docs = 0
+        self.doc_freq = np.zeros(n_features, dtype=np.int64)
+
+    def partial_fit(self, X):
+        """Count the documents of X containing each feature."""
+        X = X.tocsr()
+        X.sum_duplicates()
+        self.n_docs += X.shape[0]
+        self.doc_freq += np.bincount(X.indices, minlength=len(self.doc_freq))
+        return self
+
+    def transform(self, X):
+        """Weight X by the document frequencies seen so far."""
+        idf = np.log((1 + self.n_docs) / (1 + self.doc_freq)) + 1
+        return normalize(X.multiply(idf).tocsr())
+
+
+def _held_out(positions: np.ndarray, test_size: float, seed: int) -> np.ndarray:
+    """
+    Mask of the rows in the held-out stream. Each row's global position
+    is hashed, so the split is fixed whatever the chunk size.
+    """
+    with np.errstate(over="ignore"):
+        mixed = (positions.astype(np.uint64) + np.uint64(seed)) * np.uint64(0x9E3779B97F4A7C15)
+    return (mixed >> np.uint64(11)) / float(1 << 53) < test_size
+
+
+def _stream_chunks(filepath: str, column: str, chunk_size: int, test_size: float,
+                   seed: int, held_out: bool, batch_size: int):
+    """Yield (preprocessed texts, labels) for the train or held-out rows of each chunk."""
+    position = 0
+    for chunk in pd.read_csv(filepath, usecols=['text', 'category'], chunksize=chunk_size):
+        mask = _held_out(np.arange(position, position + len(chunk)), test_size, seed)
+        position += len(chunk)
+        if not held_out:
+            mask = ~mask
+        if mask.any():
+            rows = chunk[mask]
+            texts = preprocess_column(rows['text'].tolist(), column, batch_size=batch_size)
+            yield texts, rows['category'].to_numpy()
+
+
+def stream_train(filepath: str, column: str = "text_stemmed", chunk_size: int = 10_000,
+                 test_size: float = 0.2, n_features: int = 2 ** 20, use_idf: bool = True,
+                 classes=None, batch_size: int = 1000, random_state: int = 42):
+    """
+    Out-of-core training and evaluation:
+    - Reads filepath in chunks of chunk_size rows and preprocesses
+      each chunk into column
+    - Stateless HashingVectorizer features, optionally weighted by an
+      online IDF over the training rows seen so far
+    - Naive Bayes and SGD logistic regression trained with partial_fit
+    - test_size of the rows form a held-out stream, evaluated in a
+      second pass once training is done
+    Memory stays bounded by the chunk size and n_features, not the
+    dataset size.
 
-    results['Logistic Regression'] = accuracy_score(y_test, y_pred_lr)
+    Returns:
+        dict: accuracy of each model, like one variant of run_experiments.
+    """
+    print(f"\n🌊 Streaming training for: {column}")
+    if classes is None:
+        classes = np.array(sorted(set().union(*(
+            chunk['category'].unique()
+            for chunk in pd.read_csv(filepath, usecols=['category'], chunksize=chunk_size)
+        ))), dtype=object)
+
+    vectorizer = HashingVectorizer(n_features=n_features, alternate_sign=False,
+                                   norm=None if use_idf else "l2")
+    idf = OnlineIdf(n_features) if use_idf else None
+    models = {
+        'Naive Bayes': MultinomialNB(),
+        'SGD Log. Regression': SGDClassifier(loss="log_loss", alpha=1e-5,
+                                             random_state=random_state),
+    }
+
+    n_train = 0
+    for texts, labels in _stream_chunks(filepath, column, chunk_size, test_size,
+                                        random_state, False, batch_size):
+        X = vectorizer.transform(texts)
+        if idf is not None:
+            X = idf.partial_fit(X).transform(X)
+        for model in models.values():
+            model.partial_fit(X, labels, classes=classes)
+        n_train += len(labels)
+        print(f"  trained on {n_train} rows")
 
+    confusion = {name: np.zeros((len(classes), len(classes)), dtype=np.int64) for name in models}
+    for texts, labels in _stream_chunks(filepath, column, chunk_size, test_size,
+                                        random_state, True, batch_size):
+        X = vectorizer.transform(texts)
+        if idf is not None:
+            X = idf.transform(X)
+        for name, model in models.items():
+            confusion[name] += confusion_matrix(labels, model.predict(X), labels=classes)
+
+    results = {}
+    for name, matrix in confusion.items():
+        n_test = matrix.sum()
+        results[name] = float(matrix.trace() / n_test) if n_test else 0.0
+        print(f"\n🧾 {name} confusion matrix ({n_test} held-out rows):")
+        print(pd.DataFrame(matrix, index=classes, columns=classes))
     return results
 
 
+def main_streaming(filepath: str, chunk_size: int):
+    """Compare the preprocessing variants with out-of-core training."""
+    all_results = {
+        label: stream_train(filepath, column, chunk_size=chunk_size)
+        for label, column in TEXT_VARIANTS.items()
+    }
+    print_summary(all_results)
+
+
+# ================================
+# 📦 Model Artifacts
+# ================================
+# Layout of the artifact directories written by export_model()
+ARTIFACT_FORMAT = 1
+ARTIFACT_DIR = "artifacts"
+
+
+def _linear_weights(model) -> tuple:
+    """
+    (weights, bias) such that the model predicts the class with the
+    highest X @ weights.T + bias, for both model types.
+    """
+    if isinstance(model, MultinomialNB):
+        return model.feature_log_prob_, model.class_log_prior_
+    return model.coef_, model.intercept_
+
+
+def latest_artifact(root: str) -> str:
+    """
+    Artifact directory to load: root itself if it holds an artifact,
+    otherwise its highest vN version.
+    """
+    if os.path.exists(os.path.join(root, "manifest.json")):
+        return root
+    versions = [
+        int(name[1:]) for name in os.listdir(root) if name[:1] == "v" and name[1:].isdigit()
+    ] if os.path.isdir(root) else []
+    if not versions:
+        raise FileNotFoundError(f"No model artifact found in {root}")
+    return os.path.join(root, f"v{max(versions)}")
+
+
+def save_artifact(root: str, vectorizer: TfidfVectorizer, model, column: str,
+                  metadata: dict) -> str:
+    """
+    Save a fitted vectorizer and model as the next version under root:
+    - manifest.json: format, version, preprocessing column and its
+      preprocessor version, model name, classes, metadata
+    - vocabulary.json: the vectorizer's terms in feature order
+    - idf.npy, weights.npy, bias.npy: arrays loaded memory-mapped
+    The version directory is written under a temporary name and
+    renamed into place once complete.
+    """
+    os.makedirs(root, exist_ok=True)
+    versions = [int(name[1:]) for name in os.listdir(root)
+                if name[:1] == "v" and name[1:].isdigit()]
+    version = max(versions, default=0) + 1
+    path = os.path.join(root, f"v{version}")
+    tmp_path = os.path.join(root, f".v{version}.tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    weights, bias = _linear_weights(model)
+    np.save(os.path.join(tmp_path, "idf.npy"), vectorizer.idf_)
+    np.save(os.path.join(tmp_path, "weights.npy"), np.ascontiguousarray(weights))
+    np.save(os.path.join(tmp_path, "bias.npy"), bias)
+
+    terms = [None] * len(vectorizer.vocabulary_)
+    for term, index in vectorizer.vocabulary_.items():
+        terms[index] = term
+    with open(os.path.join(tmp_path, "vocabulary.json"), "w", encoding="utf-8") as fh:
+        json.dump(terms, fh)
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "version": version,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "column": column,
+        "preprocessor_version": preprocessor_versions()[column],
+        "classes": [str(c) for c in model.classes_],
+        **metadata,
+    }
+    with open(os.path.join(tmp_path, "manifest.json"), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+
+    os.rename(tmp_path, path)
+    return path
+
+
+def export_model(df: pd.DataFrame, root: str = ARTIFACT_DIR, test_size: float = 0.2,
+                 random_state: int = 42) -> str:
+    """
+    Train and export the best classifier:
+    - Same train/test split of the preprocessed df as run_experiments
+    - TF-IDF fitted on the training split only, for every variant
+    - Every model in MODELS compared on the test split
+    - The most accurate (variant, model) saved as a new artifact version
+
+    Returns:
+        str: Directory of the saved artifact.
+    """
+    print("\n📦 Training models to export...")
+    train_idx, test_idx = train_test_split(
+        np.arange(len(df)), test_size=test_size, random_state=random_state
+    )
+    y = df['category'].to_numpy()
+
+    best = None
+    for label, column in TEXT_VARIANTS.items():
+        vectorizer = TfidfVectorizer()
+        X_train = vectorizer.fit_transform(df[column].iloc[train_idx])
+        X_test = vectorizer.transform(df[column].iloc[test_idx])
+
+        for name, (model_cls, params) in MODELS.items():
+            model = model_cls(**params)
+            model.fit(X_train, y[train_idx])
+            accuracy = accuracy_score(y[test_idx], model.predict(X_test))
+            print(f"{label:15} | {name:20} | Accuracy: {accuracy:.2f}")
+            if best is None or accuracy > best[0]:
+                best = (accuracy, label, column, name, model, vectorizer)
+
+    accuracy, label, column, name, model, vectorizer = best
+    path = save_artifact(root, vectorizer, model, column, {
+        "variant": label,
+        "model": name,
+        "test_accuracy": accuracy,
+        "train_rows": len(train_idx),
+        "test_rows": len(test_idx),
+    })
+    print(f"✅ Saved {label} / {name} (accuracy {accuracy:.2f}) to {path}")
+    return path
+
+
+class NewsClassifier:
+    """
+    A loaded model artifact that classifies raw texts: preprocessing
+    into the artifact's column, TF-IDF with the saved vocabulary and
+    idf, then the saved linear model.
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as fh:
+            self.manifest = json.load(fh)
+        if self.manifest.get("format") != ARTIFACT_FORMAT:
+            raise ValueError(f"Unsupported artifact format in {path}: "
+                             f"{self.manifest.get('format')}")
+        with open(os.path.join(path, "vocabulary.json"), encoding="utf-8") as fh:
+            vocabulary = json.load(fh)
+
+        self.path = path
+        self.column = self.manifest["column"]
+        self.classes = np.array(self.manifest["classes"], dtype=object)
+        self.counter = CountVectorizer(vocabulary=vocabulary)
+        self.idf = np.load(os.path.join(path, "idf.npy"), mmap_mode="r")
+        self.weights = np.load(os.path.join(path, "weights.npy"), mmap_mode="r")
+        self.bias = np.load(os.path.join(path, "bias.npy"), mmap_mode="r")
+
+        if preprocessor_versions()[self.column] != self.manifest["preprocessor_version"]:
+            print(f"⚠️ {self.column} preprocessing has changed since this model was "
+                  f"trained ({self.manifest['preprocessor_version']})", file=sys.stderr)
+
+    @classmethod
+    def load(cls, root: str = ARTIFACT_DIR) -> "NewsClassifier":
+        """Load root, or its latest version."""
+        return cls(latest_artifact(root))
+
+    def predict(self, texts: list, batch_size: int = 1000) -> np.ndarray:
+        """Predict the category of each raw text."""
+        preprocessed = preprocess_column(list(texts), self.column, batch_size=batch_size)
+        X = normalize(self.counter.transform(preprocessed).multiply(self.idf).tocsr())
+        scores = X @ self.weights.T + self.bias
+        if scores.shape[1] == 1:
+            return self.classes[(scores[:, 0] > 0).astype(int)]
+        return self.classes[np.argmax(scores, axis=1)]
+
+
+def _batches(iterable, size: int):
+    """Yield lists of up to size items."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def predict_file(classifier: NewsClassifier, input_path: str = "-", output_path: str = "-",
+                 batch_size: int = 10_000) -> int:
+    """
+    Classify a large input in batches of batch_size rows:
+    - '-' as input_path: JSONL on stdin, one {"text": ...} object per
+      line, written back as JSONL with a 'predicted_category' field
+    - Otherwise a CSV with a 'text' column, written back as CSV with a
+      'predicted_category' column
+    - '-' as output_path writes to stdout
+
+    Returns:
+        int: Number of rows classified.
+    """
+    rows = 0
+    with contextlib.ExitStack() as stack:
+        out = (sys.stdout if output_path == "-" else
+               stack.enter_context(open(output_path, "w", encoding="utf-8", newline="")))
+
+        if input_path == "-":
+            lines = (line for line in sys.stdin if line.strip())
+            for batch in _batches(lines, batch_size):
+                records = [json.loads(line) for line in batch]
+                predictions = classifier.predict([record['text'] for record in records])
+                for record, prediction in zip(records, predictions):
+                    record['predicted_category'] = prediction
+                    out.write(json.dumps(record) + "\n")
+                rows += len(records)
+        else:
+            for chunk in pd.read_csv(input_path, chunksize=batch_size):
+                chunk['predicted_category'] = classifier.predict(chunk['text'].tolist())
+                chunk.to_csv(out, header=rows == 0, index=False)
+                rows += len(chunk)
+    return rows
+
+
+def main_predict(root: str, input_path: str, output_path: str, batch_size: int):
+    """Load the latest model artifact once and classify the input."""
+    start = time.perf_counter()
+    # Keep stdout for predictions
+    with contextlib.redirect_stdout(sys.stderr):
+        classifier = NewsClassifier.load(root)
+        load_resources()
+    print(f"📦 Loaded {classifier.path} ({classifier.manifest['variant']} / "
+          f"{classifier.manifest['model']})", file=sys.stderr)
+
+    rows = predict_file(classifier, input_path, output_path, batch_size)
+    seconds = time.perf_counter() - start
+    print(f"✅ Classified {rows} rows in {seconds:.2f}s", file=sys.stderr)
+
+
 # ================================
 # 📊 Comparison Summary
 # ================================
@@ -215,48 +1170,67 @@ def print_summary(results_dict):
             print(f"{prep_method:15} | {model_name:20} | Accuracy: {score:.2f}")
 
 
+def print_timings(timings: list):
+    """Display the fit and predict time of each experiment job."""
+    print("\n⏱️ JOB TIMINGS")
+    print("-" * 40)
+
+    for timing in timings:
+        print(f"{timing['variant']:15} | {timing['model']:20} | "
+              f"fit: {timing['fit_seconds']:.3f}s | predict: {timing['predict_seconds']:.3f}s")
+
+
 # ================================
 # 🏁 Main Execution
 # ================================
-def main():
+def main(data_file: str = "large_news_dataset.csv", export_dir: str = None):
     # Load dataset
-    df = load_data("large_news_dataset.csv")
+    df = load_data(data_file)
 
     # Explore dataset
     explore_data(df)
 
-    # Preprocess text
-    df = preprocess_dataset(df)
-
-    y = df['category']
-
-    # Store results
-    all_results = {}
-
-    # --------------------------
-    # Tokenized
-    # --------------------------
-    X_tok, _ = vectorize_text(df['text_tokenized'])
-    all_results['Tokenized'] = evaluate_models(X_tok, y, "Tokenized")
-
-    # --------------------------
-    # Stemmed
-    # --------------------------
-    X_stem, _ = vectorize_text(df['text_stemmed'])
-    all_results['Stemmed'] = evaluate_models(X_stem, y, "Stemmed")
+    # Preprocess text, reusing cached results
+    df = preprocess_dataset_cached(
+        df, data_file, PreprocessCache(PREPROCESS_CACHE_DIR),
+        token_cache_file=TOKEN_CACHE_FILE,
+        n_workers=PREPROCESS_WORKERS, chunk_size=PREPROCESS_CHUNK_SIZE,
+    )
 
-    # --------------------------
-    # Lemmatized
-    # --------------------------
-    X_lemma, _ = vectorize_text(df['text_lemmatized'])
-    all_results['Lemmatized'] = evaluate_models(X_lemma, y, "Lemmatized")
+    # Train and evaluate every (variant, vectorizer, model) combination
+    all_results, timings = run_experiments(df, n_workers=EXPERIMENT_WORKERS)
 
     # Print comparison
     print_summary(all_results)
+    print_timings(timings)
+
+    # Save the best model for predict
+    if export_dir:
+        export_model(df, export_dir)
 
 
 # ================================
 # ▶️ Run Script
 # ================================
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="NLP text classification pipeline")
+    parser.add_argument("--stream", action="store_true",
+                        help="train out of core on CSV chunks with hashing features")
+    parser.add_argument("--data", default="large_news_dataset.csv")
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--export", metavar="DIR",
+                        help="also save the best model as a new artifact version in DIR")
+    parser.add_argument("--predict", metavar="DIR",
+                        help="classify --input with the latest model artifact in DIR")
+    parser.add_argument("--input", default="-",
+                        help="CSV file to classify, or '-' for JSONL on stdin")
+    parser.add_argument("--output", default="-", help="output file, or '-' for stdout")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    if args.predict:
+        main_predict(args.predict, args.input, args.output, args.batch_size)
+    elif args.stream:
+        main_streaming(args.data, args.chunk_size)
+    else:
+        main(args.data, args.export)
\ No newline at end of file